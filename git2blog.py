@@ -4,15 +4,634 @@ git2blog - Generator bloga z historii Git używając Ollama LLM
 """
 
 import os
+import re
 import sys
 import json
+import time
+import fnmatch
+import contextlib
+import shutil
+import socket
+import sqlite3
+import mimetypes
+import hashlib
+import tempfile
+import threading
 import subprocess
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 import argparse
 import yaml
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
+
+np: Any
+try:
+    import numpy as np
+except ImportError:  # grupowanie semantyczne wymaga numpy (pip install git2blog[semantic])
+    np = None
+
+try:
+    import boto3
+except ImportError:  # wdrażanie do S3 wymaga boto3 (pip install git2blog[s3])
+    boto3 = None
+
+
+# Domyślne reguły rozpoznawania trywialnych commitów (sekcja trivial_commits)
+# Wzorce są zawężone (zwykle do całego tytułu) - "Format dates in RSS feed" czy
+# "Release 2.0 with plugin system" to prawdziwe zmiany i nie mogą zniknąć przy action: drop
+DEFAULT_TRIVIAL_SUBJECT_PATTERNS = [
+    r'^(fix(ed|es)?\s+)?typos?(\s+in\s+\S+)?\.?$',
+    r'^(chore\(release\):|bump(ed)?\s+version\b)',
+    r'^v?\d+\.\d+(\.\d+)?$',
+    r'^(re)?format(ting|ted)?(\s+code)?\.?$',
+    r'^(fix(ed)?\s+)?(lint|linting|whitespace)(\s+(errors|issues|warnings))?\.?$',
+    r'^wip$',
+]
+DEFAULT_TRIVIAL_TYPES = ['style']
+DEFAULT_TRIVIAL_FILE_PATTERNS = ['*.lock', 'package-lock.json', 'pnpm-lock.yaml', 'go.sum']
+CONVENTIONAL_COMMIT_RE = re.compile(r'^(?P<type>[a-zA-Z]+)(\((?P<scope>[^)]*)\))?!?:')
+
+# Stałe instrukcje (prompt systemowy) - identyczny prefiks w każdym zapytaniu
+# pozwala serwerowi Ollama ponownie użyć cache KV; zmienne dane idą w wiadomości użytkownika
+COMMIT_POST_SYSTEM_PROMPT = """Jesteś ekspertem w pisaniu postów blogowych o rozwoju oprogramowania.
+Na podstawie commita Git podanego przez użytkownika napisz interesujący post blogowy \
+w języku polskim.
+
+Napisz post blogowy który:
+1. Ma atrakcyjny tytuł (różny od tytułu commita)
+2. Wyjaśnia co zostało zrobione w przystępny sposób
+3. Opisuje dlaczego ta zmiana była ważna
+4. Ma ton conversational ale profesjonalny
+5. Jest długości 200-400 słów
+
+Zwróć tylko treść posta bez dodatkowych komentarzy."""
+
+GROUP_POST_SYSTEM_PROMPT = """Napisz post na blog na podstawie commitów podanych przez użytkownika.
+Napisz szczegółowy post opisujący zmiany wprowadzone w tych commitach.
+Uwzględnij kontekst techniczny i biznesowy zmian.
+Pisz w języku polskim, w stylu profesjonalnego bloga technicznego."""
+
+COMMIT_TITLE_SYSTEM_PROMPT = """Na podstawie commita Git podanego przez użytkownika \
+zaproponuj krótki, atrakcyjny tytuł posta blogowego w języku polskim (maksymalnie 60 znaków).
+Zwróć tylko tytuł bez dodatkowych komentarzy."""
+
+GROUP_TITLE_SYSTEM_PROMPT = """Napisz krótki, zwięzły tytuł dla posta o treści podanej \
+przez użytkownika, nie dłuższy niż 10 słów.
+Zwróć tylko tytuł bez dodatkowych komentarzy."""
+
+TITLES_BATCH_SYSTEM_PROMPT = """Dla każdego posta blogowego z numerowanej listy podanej \
+przez użytkownika zaproponuj krótki, atrakcyjny tytuł w języku polskim (maksymalnie 60 znaków).
+Zwróć wyłącznie listę JSON z tytułami w tej samej kolejności, np. ["Tytuł 1", "Tytuł 2"]."""
+
+CLASSIFICATION_SYSTEM_PROMPT = """Oceń, czy commit Git podany przez użytkownika jest trywialny \
+(literówka, formatowanie, podbicie wersji, aktualizacja zależności) i nie zasługuje \
+na osobny post na blogu.
+Odpowiedz jednym słowem: TAK albo NIE."""
+
+# Zadania LLM, dla których można skonfigurować osobny model (sekcja models)
+LLM_TASKS = ('body', 'title', 'summary', 'classification', 'embeddings')
+
+# Kody HTTP, którymi Ollama (lub proxy przed nią) sygnalizuje przeciążenie
+OVERLOAD_STATUS_CODES = (429, 503)
+
+
+def parse_commit_date(date: str) -> datetime:
+    """Parsuje datę commita w formacie git --date=iso (bez strefy czasowej)"""
+    try:
+        return datetime.strptime(date[:19], '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return datetime.strptime(date[:10], '%Y-%m-%d')
+
+
+def otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Zamienia parę klucz-wartość na atrybut OTLP JSON"""
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+def write_atomic(path: Path, content: str):
+    """Zapisuje plik atomowo (plik tymczasowy + os.replace)"""
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, str(path))
+    except BaseException:
+        if Path(tmp_path).exists():
+            os.unlink(tmp_path)
+        raise
+
+
+class AdaptiveConcurrencyLimiter:
+    """Kontroler AIMD liczby równoległych zapytań do Ollama
+
+    Każda szybka odpowiedź zwiększa limit addytywnie (o ok. 1 na pełne okno),
+    a przekroczenie docelowego opóźnienia, timeout albo HTTP 429/503
+    zmniejsza go multiplikatywnie - najwyżej raz na okno zapytań.
+    """
+
+    def __init__(self, initial: int = 1, minimum: int = 1, maximum: int = 4,
+                 target_latency: float = 60.0, decrease_factor: float = 0.5):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.waiting = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    def acquire(self) -> float:
+        """Czeka na wolne miejsce i zwraca czas rozpoczęcia zapytania"""
+        with self._cond:
+            self.waiting += 1
+            while self.in_flight >= self.current_limit:
+                self._cond.wait()
+            self.waiting -= 1
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started_at: float, overloaded: bool = False):
+        """Zwalnia miejsce i aktualizuje limit na podstawie wyniku zapytania"""
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded or now - started_at > self.target_latency:
+                # Zapytania rozpoczęte przed ostatnią redukcją nie redukują ponownie
+                if started_at >= self._last_decrease:
+                    self.limit = max(float(self.minimum), self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, int]:
+        """Zwraca bieżący limit, liczbę zapytań w toku i długość kolejki"""
+        with self._cond:
+            return {'limit': self.current_limit, 'in_flight': self.in_flight,
+                    'waiting': self.waiting}
+
+
+class WorkQueue:
+    """Współdzielona kolejka zadań generowania w SQLite z dzierżawą (lease)
+
+    Koordynator dodaje zadania (--enqueue), procesy --worker pobierają je,
+    dzierżawiąc na lease_seconds, i zapisują wygenerowane posty. Zadanie,
+    którego dzierżawa wygasła (np. worker padł), może pobrać inny worker.
+    """
+
+    def __init__(self, path: str, lease_seconds: int = 600, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self.connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    key TEXT PRIMARY KEY,
+                    number INTEGER,
+                    payload TEXT NOT NULL,
+                    config_hash TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    updated REAL
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, number)")
+
+    def connect(self) -> sqlite3.Connection:
+        """Otwiera połączenie (osobne dla każdego wątku/procesu)"""
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def enqueue(self, jobs: Iterable[Dict[str, Any]], config_hash: str,
+                batch_size: int = 500) -> int:
+        """Dodaje zadania; gotowe zadania z tym samym config_hash nie są powtarzane
+
+        Strumień zadań (git, klasyfikacja, embeddingi) jest czytany partiami poza
+        transakcją - blokada zapisu trwa tylko na czas wstawienia gotowej partii.
+        """
+        count = 0
+        first = True
+        jobs = iter(jobs)
+        while True:
+            batch = []
+            for job in jobs:
+                batch.append(job)
+                if len(batch) >= batch_size:
+                    break
+            if not batch and not first:
+                return count
+            self.insert_jobs(batch, config_hash, reset=first)
+            count += len(batch)
+            first = False
+
+    def insert_jobs(self, jobs: List[Dict[str, Any]], config_hash: str, reset: bool = False):
+        """Wstawia partię zadań jedną transakcją (reset - nowy zestaw bieżących zadań)
+
+        Nieudane zadania wracają do kolejki z wyzerowaną liczbą prób.
+        """
+        db = self.connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            if reset:
+                # Numeracja dotyczy tylko bieżącego zestawu zadań
+                db.execute("UPDATE jobs SET number = NULL")
+            for job in jobs:
+                db.execute("""
+                    INSERT INTO jobs (key, number, payload, config_hash, updated)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        number = excluded.number,
+                        payload = excluded.payload,
+                        status = CASE WHEN jobs.config_hash = excluded.config_hash
+                                           AND jobs.status != 'failed'
+                                      THEN jobs.status ELSE 'pending' END,
+                        result = CASE WHEN jobs.config_hash = excluded.config_hash
+                                      THEN jobs.result ELSE NULL END,
+                        attempts = CASE WHEN jobs.config_hash = excluded.config_hash
+                                             AND jobs.status != 'failed'
+                                        THEN jobs.attempts ELSE 0 END,
+                        config_hash = excluded.config_hash,
+                        updated = excluded.updated
+                """, (job['key'], job['number'], json.dumps(job, ensure_ascii=False),
+                      config_hash, time.time()))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def claim(self, worker: str, config_hash: str) -> Optional[Dict[str, Any]]:
+        """Dzierżawi najstarsze (wg numeru posta) wolne zadanie lub zwraca None"""
+        now = time.time()
+        db = self.connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            # Wygasła dzierżawa po ostatniej próbie (np. worker padał na tym zadaniu)
+            db.execute("""
+                UPDATE jobs SET status = 'failed', lease_until = NULL, updated = ?
+                WHERE status = 'leased' AND lease_until < ? AND attempts >= ?
+            """, (now, now, self.max_attempts))
+            row = db.execute("""
+                SELECT key, payload FROM jobs
+                WHERE number IS NOT NULL AND config_hash = ?
+                  AND (status = 'pending'
+                       OR (status = 'leased' AND lease_until < ? AND attempts < ?))
+                ORDER BY number LIMIT 1
+            """, (config_hash, now, self.max_attempts)).fetchone()
+            if row is not None:
+                db.execute("""
+                    UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?,
+                                    attempts = attempts + 1, updated = ?
+                    WHERE key = ?
+                """, (worker, now + self.lease_seconds, now, row[0]))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+        return json.loads(row[1]) if row is not None else None
+
+    def complete(self, key: str, worker: str, post: Dict[str, Any]) -> bool:
+        """Zapisuje wynik zadania (tylko przez workera, który je dzierżawi)"""
+        with self.connect() as db:
+            cursor = db.execute("""
+                UPDATE jobs SET status = 'done', result = ?, lease_until = NULL, updated = ?
+                WHERE key = ? AND worker = ? AND status = 'leased'
+            """, (json.dumps(post, ensure_ascii=False), time.time(), key, worker))
+            return cursor.rowcount == 1
+
+    def release(self, key: str, worker: str):
+        """Zwalnia dzierżawę po błędzie; po max_attempts zadanie jest oznaczane jako nieudane"""
+        with self.connect() as db:
+            db.execute("""
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                lease_until = NULL, updated = ?
+                WHERE key = ? AND worker = ? AND status = 'leased'
+            """, (self.max_attempts, time.time(), key, worker))
+
+    def counts(self) -> Dict[str, int]:
+        """Zwraca liczbę bieżących zadań w każdym stanie"""
+        with self.connect() as db:
+            rows = db.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE number IS NOT NULL GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def results(self) -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """Zwraca bieżące zadania wg numeru posta wraz z wynikiem (None jeśli niegotowe)"""
+        db = self.connect()
+        try:
+            for payload, status, result in db.execute(
+                "SELECT payload, status, result FROM jobs WHERE number IS NOT NULL ORDER BY number"
+            ):
+                yield json.loads(payload), json.loads(result) if status == 'done' else None
+        finally:
+            db.close()
+
+
+class ProgressReporter:
+    """Zdarzenia postępu generowania: widok na żywo, spany OTLP i metryki Prometheus
+
+    Widok w terminalu (TTY) to jedna odświeżana linia z liczbą gotowych postów,
+    ETA, tokenami/s, zapytaniami w toku i w kolejce do limitera oraz trafieniami cache.
+    Poza terminalem każdy gotowy post jest wypisywany w osobnej linii. Spany (przebieg -> post
+    -> wywołanie LLM) są wysyłane w formacie OTLP/HTTP JSON na
+    {otlp_endpoint}/v1/traces, a metryki są dostępne pod /metrics.
+    """
+
+    def __init__(self, snapshot=None, live: Any = 'auto', interval: float = 1.0,
+                 stall_seconds: float = 120.0, otlp_endpoint: str = '',
+                 metrics_port: Optional[int] = None, metrics_host: str = '127.0.0.1',
+                 service_name: str = 'git2blog',
+                 export_batch: int = 64):
+        self.snapshot = snapshot or (lambda: {'limit': 0, 'in_flight': 0, 'waiting': 0})
+        self.live = sys.stderr.isatty() if live == 'auto' else bool(live)
+        self.interval = interval
+        self.stall_seconds = stall_seconds
+        self.otlp_endpoint = otlp_endpoint.rstrip('/')
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        self.service_name = service_name
+        self.export_batch = export_batch
+        self.metrics_server = None
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread = None
+        self._spans: List[Dict[str, Any]] = []
+        self._export_failed = False
+        self.reset()
+
+    def reset(self):
+        """Zeruje liczniki przed nowym przebiegiem"""
+        with self._lock:
+            self.started = time.monotonic()
+            self.last_progress = self.started
+            self.total = 0
+            self.done = 0
+            self.cached = 0
+            self.llm_calls = {}
+            self.llm_errors = 0
+            self.llm_seconds = 0.0
+            self.prompt_tokens = 0
+            self.output_tokens = 0
+            self.trace_id = os.urandom(16).hex()
+            self.root_span = None
+
+    # Zdarzenia
+
+    def start(self):
+        """Rozpoczyna przebieg: span główny, serwer metryk i odświeżanie widoku"""
+        self.reset()
+        self.root_span = {'span_id': os.urandom(8).hex(), 'start': time.time_ns()}
+        if self.metrics_port is not None:
+            self.start_metrics_server()
+        if self.live:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._render_loop, daemon=True)
+            self._thread.start()
+
+    def finish(self):
+        """Kończy przebieg: ostatni widok, eksport spanów i zatrzymanie serwera metryk"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            sys.stderr.write('\r\x1b[K' + self.status_line() + '\n')
+            sys.stderr.flush()
+        if self.root_span is not None:
+            self.add_span('generate_blog', self.root_span['span_id'], None, self.root_span['start'],
+                          {'posts': self.done, 'cached': self.cached})
+            self.root_span = None
+        self.flush_spans()
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+            self.metrics_server = None
+
+    def message(self, text: str):
+        """Wypisuje komunikat nad linią widoku na żywo"""
+        with self._lock:
+            if self.live and self._thread is not None:
+                sys.stderr.write('\r\x1b[K')
+            print(text)
+
+    def job_queued(self, job: Dict[str, Any]):
+        """Zadanie trafiło do generowania"""
+        with self._lock:
+            self.total += 1
+
+    def job_cached(self, job: Dict[str, Any]):
+        """Post zadania został wczytany z cache"""
+        with self._lock:
+            self.total += 1
+            self.cached += 1
+
+    @contextlib.contextmanager
+    def job_span(self, job: Dict[str, Any]):
+        """Span generowania posta; wywołania LLM w tym wątku stają się jego dziećmi"""
+        span_id = os.urandom(8).hex()
+        start = time.time_ns()
+        self._local.span_id = span_id
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self._local.span_id = None
+            commits = job['group']['commits'] if 'group' in job else [job['commit']]
+            self.add_span('post', span_id, self.root_span and self.root_span['span_id'], start, {
+                'git2blog.kind': job['kind'],
+                'git2blog.label': job['label'],
+                'git2blog.commit': commits[0]['hash'],
+                'git2blog.commits': len(commits)
+            }, error=error)
+
+    def llm_call(self, task: str, model: str, start_ns: int, data: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None):
+        """Zakończone wywołanie LLM (data - odpowiedź Ollama, error - opis błędu)"""
+        data = data or {}
+        with self._lock:
+            self.llm_calls[task] = self.llm_calls.get(task, 0) + 1
+            self.llm_seconds += (time.time_ns() - start_ns) / 1e9
+            self.prompt_tokens += data.get('prompt_eval_count', 0)
+            self.output_tokens += data.get('eval_count', 0)
+            if error:
+                self.llm_errors += 1
+        parent = (getattr(self._local, 'span_id', None)
+                  or (self.root_span and self.root_span['span_id']))
+        self.add_span(f'llm {task}', os.urandom(8).hex(), parent, start_ns, {
+            'gen_ai.system': 'ollama',
+            'gen_ai.request.model': model,
+            'gen_ai.usage.input_tokens': data.get('prompt_eval_count', 0),
+            'gen_ai.usage.output_tokens': data.get('eval_count', 0),
+            'git2blog.task': task
+        }, error=error)
+
+    def post_written(self, job: Dict[str, Any]):
+        """Post został zapisany na dysku"""
+        with self._lock:
+            self.done += 1
+            self.last_progress = time.monotonic()
+            if not self.live:
+                state = self.snapshot()
+                queued = max(0, self.total - self.done - state['in_flight'])
+                print(f"⏳ Post {self.done}/{self.total}: {job['label']} "
+                      f"[limit: {state['limit']}, w toku: {state['in_flight']}, "
+                      f"w kolejce: {queued}]")
+
+    # Widok na żywo
+
+    def status_line(self) -> str:
+        """Zwraca linię stanu: gotowe/wszystkie, ETA, tokeny/s, zapytania w toku, cache"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.started
+            state = self.snapshot()
+            if self.done and self.total > self.done:
+                eta = f"{(self.total - self.done) * elapsed / self.done:.0f}s"
+            else:
+                eta = '?' if self.total > self.done else '0s'
+            rate = self.output_tokens / elapsed if elapsed > 0 else 0.0
+            line = (f"⏳ {self.done}/{self.total} postów | ETA {eta} | {rate:.1f} tok/s | "
+                    f"w toku: {state['in_flight']} (limit {state['limit']}), "
+                    f"w kolejce: {state['waiting']} | "
+                    f"cache: {self.cached}")
+            stalled = now - self.last_progress
+            if self.total > self.done and stalled > self.stall_seconds:
+                line += f" | ⚠️ brak postępu od {stalled:.0f}s"
+            return line
+
+    def _render_loop(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                sys.stderr.write('\r\x1b[K' + self.status_line())
+                sys.stderr.flush()
+
+    # OpenTelemetry
+
+    def add_span(self, name: str, span_id: str, parent_id: Optional[str], start_ns: int,
+                 attributes: Dict[str, Any], error: Optional[str] = None):
+        """Dodaje zakończony span do bufora eksportu OTLP"""
+        if not self.otlp_endpoint:
+            return
+        span = {
+            'traceId': self.trace_id,
+            'spanId': span_id,
+            'name': name,
+            'kind': 1,
+            'startTimeUnixNano': str(start_ns),
+            'endTimeUnixNano': str(time.time_ns()),
+            'attributes': [otlp_attribute(key, value) for key, value in attributes.items()],
+            'status': {'code': 2, 'message': error} if error else {'code': 1}
+        }
+        if parent_id:
+            span['parentSpanId'] = parent_id
+        with self._lock:
+            self._spans.append(span)
+            full = len(self._spans) >= self.export_batch
+        if full:
+            self.flush_spans()
+
+    def flush_spans(self):
+        """Wysyła zbuforowane spany na {otlp_endpoint}/v1/traces"""
+        with self._lock:
+            spans, self._spans = self._spans, []
+        if not spans or not self.otlp_endpoint:
+            return
+        payload = {'resourceSpans': [{
+            'resource': {'attributes': [otlp_attribute('service.name', self.service_name)]},
+            'scopeSpans': [{'scope': {'name': 'git2blog'}, 'spans': spans}]
+        }]}
+        try:
+            response = requests.post(f"{self.otlp_endpoint}/v1/traces", json=payload, timeout=5)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            # Telemetria nie może przerwać generowania - błąd zgłaszamy raz
+            if not self._export_failed:
+                self._export_failed = True
+                self.message(f"⚠️ Nie udało się wysłać spanów OTLP: {e}")
+
+    # Prometheus
+
+    def metrics_text(self) -> str:
+        """Zwraca metryki w formacie tekstowym Prometheus"""
+        with self._lock:
+            state = self.snapshot()
+            cached = min(self.cached, self.done)
+            lines = [
+                '# TYPE git2blog_posts_total counter',
+                f'git2blog_posts_total{{source="generated"}} {self.done - cached}',
+                f'git2blog_posts_total{{source="cache"}} {cached}',
+                '# TYPE git2blog_jobs gauge',
+                f'git2blog_jobs {self.total}',
+                '# TYPE git2blog_llm_calls_total counter'
+            ]
+            lines += [f'git2blog_llm_calls_total{{task="{task}"}} {count}'
+                      for task, count in sorted(self.llm_calls.items())]
+            lines += [
+                '# TYPE git2blog_llm_errors_total counter',
+                f'git2blog_llm_errors_total {self.llm_errors}',
+                '# TYPE git2blog_llm_seconds_total counter',
+                f'git2blog_llm_seconds_total {self.llm_seconds:.3f}',
+                '# TYPE git2blog_llm_tokens_total counter',
+                f'git2blog_llm_tokens_total{{type="prompt"}} {self.prompt_tokens}',
+                f'git2blog_llm_tokens_total{{type="output"}} {self.output_tokens}',
+                '# TYPE git2blog_llm_in_flight gauge',
+                f'git2blog_llm_in_flight {state["in_flight"]}',
+                '# TYPE git2blog_llm_concurrency_limit gauge',
+                f'git2blog_llm_concurrency_limit {state["limit"]}',
+                '# TYPE git2blog_seconds_since_progress gauge',
+                f'git2blog_seconds_since_progress {time.monotonic() - self.last_progress:.1f}'
+            ]
+            return '\n'.join(lines) + '\n'
+
+    def start_metrics_server(self):
+        """Uruchamia endpoint /metrics w wątku w tle"""
+        reporter = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                body = reporter.metrics_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        # Domyślnie tylko lokalnie - udostępnienie w sieci wymaga jawnego metrics_host
+        self.metrics_server = ThreadingHTTPServer((self.metrics_host, self.metrics_port),
+                                                  MetricsHandler)
+        threading.Thread(target=self.metrics_server.serve_forever, daemon=True).start()
+        host, port = self.metrics_server.server_address[:2]
+        print(f"📈 Metryki Prometheus: http://{host}:{port}/metrics")
 
 
 class Git2Blog:
@@ -22,12 +641,45 @@ class Git2Blog:
         self.model = self.config.get('model', 'llama3.2')
         self.output_dir = Path(self.config.get('output_dir', 'blog'))
         self.template_dir = Path(self.config.get('template_dir', 'templates'))
+        self.state_dir = self.output_dir / '.git2blog'
+        self.timeout = int(os.environ.get('OLLAMA_TIMEOUT', self.config.get('timeout', 120)))
+
+        concurrency = self.config.get('concurrency', {})
+        self.limiter = AdaptiveConcurrencyLimiter(
+            initial=concurrency.get('initial', 1),
+            minimum=concurrency.get('min', 1),
+            maximum=concurrency.get('max', 4),
+            target_latency=concurrency.get('target_latency', self.timeout / 2),
+        )
+        self.overload_retries = concurrency.get('retries', 2)
+        self.title_batch_size = self.config.get('titles', {}).get('batch_size', 10)
+        # Szacowane wywołania LLM w trybie --plan (None - zwykłe generowanie)
+        self.plan_estimates: Optional[Dict[str, int]] = None
+
+        # Postęp i telemetria (OTLP/HTTP JSON i Prometheus są opcjonalne)
+        telemetry = self.config.get('telemetry', {})
+        self.progress = ProgressReporter(
+            snapshot=self.limiter.snapshot,
+            live=telemetry.get('live', 'auto'),
+            interval=telemetry.get('interval', 1.0),
+            stall_seconds=telemetry.get('stall_seconds', 120),
+            otlp_endpoint=(telemetry.get('otlp_endpoint')
+                           or os.environ.get('OTEL_EXPORTER_OTLP_ENDPOINT', '')),
+            metrics_port=telemetry.get('metrics_port'),
+            metrics_host=telemetry.get('metrics_host', '127.0.0.1'),
+            service_name=telemetry.get('service_name', 'git2blog')
+        )
+
+        # Statystyki wywołań LLM bieżącego przebiegu (zapisywane dla --plan)
+        self.stats = {'calls': 0, 'latency': 0.0, 'server_seconds': 0.0, 'prompt_eval_seconds': 0.0,
+                      'prompt_chars': 0, 'prompt_tokens': 0, 'output_tokens': 0}
+        self.stats_lock = threading.Lock()
 
     def load_config(self, config_path: str) -> Dict[str, Any]:
         """Wczytuje konfigurację z pliku YAML"""
         if os.path.exists(config_path):
             with open(config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+                return yaml.safe_load(f) or {}
         return {}
 
     def create_default_config(self):
@@ -55,95 +707,448 @@ class Git2Blog:
 
         print("✅ Utworzono domyślny plik konfiguracyjny: git2blog.yaml")
 
-    def get_git_commits(self, limit: int = 50) -> List[Dict[str, str]]:
+    def git_selection_args(self, revisions: Optional[List[str]] = None) -> List[str]:
+        """Zwraca argumenty git log wybierające commity (sekcja commit_selection)
+
+        revisions zastępuje revision_range z konfiguracji (np. wynikiem resolve_revisions).
+        """
+        selection = self.config.get('commit_selection', {})
+        args = []
+        if selection.get('since'):
+            args.append(f"--since={selection['since']}")
+        if selection.get('until'):
+            args.append(f"--until={selection['until']}")
+        authors = selection.get('authors', [])
+        for author in [authors] if isinstance(authors, str) else authors:
+            args.append(f"--author={author}")
+        if selection.get('first_parent'):
+            args.append('--first-parent')
+
+        if revisions is None:
+            revisions = self.configured_revisions()
+        args.extend(revisions)
+
+        paths = selection.get('paths', [])
+        if paths:
+            args.append('--')
+            args.extend([paths] if isinstance(paths, str) else paths)
+        return args
+
+    def configured_revisions(self) -> List[str]:
+        """Zwraca revision_range z sekcji commit_selection jako listę"""
+        revisions = self.config.get('commit_selection', {}).get('revision_range', [])
+        return [revisions] if isinstance(revisions, str) else list(revisions)
+
+    def resolve_revisions(self) -> Optional[List[str]]:
+        """Zamienia revision_range (domyślnie HEAD) na stałe hashe commitów
+
+        Stronicowanie przez --skip względem ruchomego HEAD dublowałoby commity,
+        gdy w trakcie przebiegu pojawią się nowe. None, gdy git nie zna rewizji.
+        """
+        revisions = self.configured_revisions() or ['HEAD']
+        try:
+            result = subprocess.run(['git', 'rev-parse', *revisions],
+                                    capture_output=True, text=True, encoding='utf-8')
+        except OSError:
+            return None
+        if result.returncode != 0:
+            return None
+        return [line for line in result.stdout.split('\n') if line.strip()]
+
+    def get_git_commits(self, limit: int = 50, skip: int = 0,
+                        revisions: Optional[List[str]] = None) -> List[Dict[str, str]]:
         """Pobiera listę commitów z repozytorium Git"""
         try:
+            # Rekordy rozdzielone \x1e, pola \x00 - treść commita może zawierać '|' i nowe linie
             cmd = [
                 'git', 'log',
                 f'--max-count={limit}',
-                '--pretty=format:%H|%an|%ae|%ad|%s|%b',
+                '--pretty=format:%x1e%H%x00%an%x00%ae%x00%ad%x00%s%x00%b',
                 '--date=iso'
             ]
 
-            if self.config.get('ignore_merge_commits', True):
+            if skip:
+                cmd.append(f'--skip={skip}')
+
+            # Przy --first-parent na gałęzi głównej z merge'ami to właśnie merge'e
+            # reprezentują zmiany - --no-merges usunąłby je z historii
+            first_parent = self.config.get('commit_selection', {}).get('first_parent', False)
+            if self.config.get('ignore_merge_commits', True) and not first_parent:
                 cmd.append('--no-merges')
 
+            cmd.extend(self.git_selection_args(revisions))
+
             result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
 
             if result.returncode != 0:
                 raise Exception(f"Git error: {result.stderr}")
 
             commits = []
-            for line in result.stdout.strip().split('\n'):
-                if not line:
-                    continue
-
-                parts = line.split('|', 5)
-                if len(parts) >= 5:
+            for record in result.stdout.split('\x1e'):
+                parts = record.strip('\n').split('\x00', 5)
+                if len(parts) >= 5 and parts[0]:
                     commits.append({
                         'hash': parts[0],
                         'author': parts[1],
                         'email': parts[2],
                         'date': parts[3],
                         'subject': parts[4],
-                        'body': parts[5] if len(parts) > 5 else ''
+                        'body': parts[5].strip() if len(parts) > 5 else ''
                     })
 
             return commits
 
         except Exception as e:
-            print(f"❌ Błąd podczas pobierania commitów: {e}")
+            self.progress.message(f"❌ Błąd podczas pobierania commitów: {e}")
             return []
 
-    def call_ollama(self, prompt: str) -> str:
-        """Wywołuje Ollama API z promptem"""
+    def iter_commit_chunks(self, limit: int) -> Iterator[List[Dict[str, str]]]:
+        """Pobiera commity partiami (commit_chunk_size), od najnowszych"""
+        chunk_size = self.config.get('commit_chunk_size', 1000)
+        # Wszystkie partie liczone od tego samego, raz ustalonego wierzchołka
+        revisions = self.resolve_revisions()
+        skip = 0
+        while skip < limit:
+            requested = min(chunk_size, limit - skip)
+            chunk = self.get_git_commits(requested, skip=skip, revisions=revisions)
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < requested:
+                return
+            skip += len(chunk)
+
+    def get_commit_files(self, hashes: List[str]) -> Dict[str, List[str]]:
+        """Pobiera listy zmienionych plików dla wielu commitów jednym wywołaniem git"""
+        if not hashes:
+            return {}
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=120
+            result = subprocess.run(
+                ['git', 'log', '--no-walk=unsorted', '--stdin', '--name-only', '--format=%x00%H'],
+                input='\n'.join(hashes) + '\n',
+                capture_output=True, text=True, encoding='utf-8'
             )
 
+            if result.returncode != 0:
+                raise Exception(f"Git error: {result.stderr}")
+
+            files = {}
+            for chunk in result.stdout.split('\x00'):
+                lines = [line for line in chunk.split('\n') if line.strip()]
+                if lines:
+                    files[lines[0].strip()] = lines[1:]
+            return files
+
+        except Exception as e:
+            self.progress.message(f"❌ Błąd podczas pobierania listy plików: {e}")
+            return {}
+
+    def get_patch_ids(self, hashes: List[str]) -> Dict[str, str]:
+        """Pobiera stabilne patch-id wielu commitów jednym potokiem git log -p | git patch-id"""
+        if not hashes:
+            return {}
+        try:
+            log = subprocess.Popen(
+                ['git', 'log', '--no-walk=unsorted', '--stdin', '-p', '--no-color', '--no-ext-diff',
+                 '--format=commit %H'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+            patch_id = subprocess.Popen(
+                ['git', 'patch-id', '--stable'],
+                stdin=log.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            log_stdin, log_stdout = log.stdin, log.stdout
+            assert log_stdin is not None and log_stdout is not None
+            log_stdout.close()
+            # git log --stdin czyta całe wejście przed wypisaniem diffów
+            log_stdin.write(('\n'.join(hashes) + '\n').encode('utf-8'))
+            log_stdin.close()
+            output, error = patch_id.communicate()
+            log.wait()
+
+            if log.returncode != 0 or patch_id.returncode != 0:
+                raise Exception(f"Git error: {error.decode('utf-8', 'replace')}")
+
+            # Linie "<patch-id> <commit>"; merge i puste commity nie mają patch-id
+            patch_ids = {}
+            for line in output.decode('utf-8').splitlines():
+                parts = line.split()
+                if len(parts) == 2:
+                    patch_ids[parts[1]] = parts[0]
+            return patch_ids
+
+        except Exception as e:
+            self.progress.message(f"❌ Błąd podczas obliczania patch-id: {e}")
+            return {}
+
+    def commit_identity(self, commit: Dict[str, Any]) -> str:
+        """Zwraca tożsamość commita niezależną od rebase i cherry-pick (patch-id + wiadomość)"""
+        if not commit.get('patch_id'):
+            return commit['hash']
+        message = hashlib.sha1(f"{commit['subject']}\n{commit['body']}".encode('utf-8')).hexdigest()
+        return f"{commit['patch_id']}:{message}"
+
+    def classify_commit(self, commit: Dict[str, Any]) -> Optional[str]:
+        """Zwraca powód uznania commita za trywialny albo None"""
+        settings = self.config.get('trivial_commits', {})
+        subject = commit['subject'].strip()
+
+        for pattern in settings.get('subject_patterns', DEFAULT_TRIVIAL_SUBJECT_PATTERNS):
+            if re.search(pattern, subject, re.IGNORECASE):
+                return 'subject'
+
+        match = CONVENTIONAL_COMMIT_RE.match(subject)
+        types = [t.lower() for t in settings.get('types', DEFAULT_TRIVIAL_TYPES)]
+        if match and match.group('type').lower() in types:
+            return 'type'
+
+        # Commit dotykający wyłącznie plików typu lockfile
+        files = commit.get('files')
+        file_patterns = settings.get('file_patterns', DEFAULT_TRIVIAL_FILE_PATTERNS)
+        if files and file_patterns and all(
+            any(fnmatch.fnmatch(os.path.basename(f), p) or fnmatch.fnmatch(f, p)
+                for p in file_patterns)
+            for f in files
+        ):
+            return 'files'
+
+        return None
+
+    def build_classification_prompt(self, commit: Dict[str, Any]) -> str:
+        """Buduje zmienną część promptu klasyfikacji commita"""
+        prompt = f"Tytuł: {commit['subject']}\nOpis: {commit['body'][:300]}"
+        if commit.get('files'):
+            prompt += f"\nPliki: {', '.join(commit['files'][:20])}"
+        return prompt
+
+    def classify_commit_llm(self, commit: Dict[str, Any]) -> bool:
+        """Pyta model klasyfikacji, czy commit jest trywialny"""
+        prompt = self.build_classification_prompt(commit)
+        if self.plan_estimates is not None:
+            # Tryb --plan: bez wywołania modelu, commit liczony jako zwykły
+            self.plan_estimates['classification_calls'] += 1
+            self.plan_estimates['prompt_chars'] += len(CLASSIFICATION_SYSTEM_PROMPT) + len(prompt)
+            return False
+        answer = self.call_ollama(prompt, system=CLASSIFICATION_SYSTEM_PROMPT,
+                                  task='classification')
+        return answer.strip().upper().startswith('TAK')
+
+    def filter_trivial_commits(self, commits: List[Dict[str, Any]]
+                               ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Dzieli commity na zwykłe i trywialne (wymagające pominięcia LLM)"""
+        settings = self.config.get('trivial_commits', {})
+        if not settings.get('enabled', False):
+            return commits, []
+
+        if settings.get('file_patterns', DEFAULT_TRIVIAL_FILE_PATTERNS):
+            files = self.get_commit_files([c['hash'] for c in commits])
+            for commit in commits:
+                if commit['hash'] in files:
+                    commit['files'] = files[commit['hash']]
+
+        regular, trivial = [], []
+        for commit in commits:
+            reason = self.classify_commit(commit)
+            if not reason and settings.get('use_llm') and self.classify_commit_llm(commit):
+                reason = 'llm'
+            if reason:
+                commit['trivial_reason'] = reason
+                trivial.append(commit)
+            else:
+                regular.append(commit)
+        return regular, trivial
+
+    def task_model(self, task: str) -> Tuple[str, Dict[str, Any]]:
+        """Zwraca model i dodatkowe pola zapytania (options, keep_alive) dla zadania LLM"""
+        if task == 'embeddings':
+            grouping = self.config.get('post_grouping', {})
+            default = grouping.get('embedding_model', 'nomic-embed-text')
+        else:
+            default = self.model
+        setting = self.config.get('models', {}).get(task, default)
+        if isinstance(setting, str):
+            setting = {'model': setting}
+
+        extra = {}
+        if setting.get('options'):
+            extra['options'] = setting['options']
+        keep_alive = setting.get('keep_alive', self.config.get('keep_alive'))
+        if keep_alive is not None:
+            extra['keep_alive'] = keep_alive
+        return setting.get('model', default), extra
+
+    def preload_models(self):
+        """Ładuje modele wszystkich zadań, żeby pozostały w pamięci przez cały przebieg"""
+        models = {}
+        for task in LLM_TASKS[:-1]:
+            model, extra = self.task_model(task)
+            models.setdefault(model, extra)
+        if len(models) < 2:
+            return
+
+        for model, extra in models.items():
+            try:
+                # Puste zapytanie tylko ładuje model (z keep_alive z konfiguracji)
+                requests.post(f"{self.ollama_url}/api/generate",
+                              json=dict(extra, model=model, prompt='', stream=False),
+                              timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                print(f"❌ Nie udało się załadować modelu {model}: {e}")
+        print(f"🧠 Modele w pamięci: {', '.join(models)}")
+
+    def call_ollama(self, prompt: str, system: Optional[str] = None, task: str = 'body') -> str:
+        """Wywołuje Ollama API z promptem
+
+        Z promptem systemowym używa /api/chat (stały prefiks instrukcji przed
+        zmiennymi danymi), bez niego /api/generate. Model wybiera task.
+        """
+        model, extra = self.task_model(task)
+        if system:
+            endpoint = 'chat'
+            payload = dict(extra, **{
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                "stream": False
+            })
+        else:
+            endpoint = 'generate'
+            payload = dict(extra, **{
+                "model": model,
+                "prompt": prompt,
+                "stream": False
+            })
+
+        for attempt in range(self.overload_retries + 1):
+            started_at = self.limiter.acquire()
+            start_ns = time.time_ns()
+            overloaded = False
+            try:
+                response = requests.post(
+                    f"{self.ollama_url}/api/{endpoint}",
+                    json=payload,
+                    timeout=self.timeout
+                )
+                overloaded = response.status_code in OVERLOAD_STATUS_CODES
+
+            except requests.exceptions.Timeout as e:
+                overloaded = True
+                self.progress.llm_call(task, model, start_ns, error=f"timeout: {e}")
+                self.progress.message(f"❌ Timeout połączenia z Ollama: {e}")
+                return ""
+
+            except requests.exceptions.RequestException as e:
+                self.progress.llm_call(task, model, start_ns, error=str(e))
+                self.progress.message(f"❌ Błąd połączenia z Ollama: {e}")
+                return ""
+
+            finally:
+                self.limiter.release(started_at, overloaded=overloaded)
+
             if response.status_code == 200:
-                return response.json().get('response', '').strip()
+                data = response.json()
+                self.record_call_stats(time.monotonic() - started_at,
+                                       len(prompt) + len(system or ''), data)
+                self.progress.llm_call(task, model, start_ns, data)
+                if endpoint == 'chat':
+                    return data.get('message', {}).get('content', '').strip()
+                return data.get('response', '').strip()
+            self.progress.llm_call(task, model, start_ns, error=f"HTTP {response.status_code}")
+            if overloaded and attempt < self.overload_retries:
+                # Serwer przeciążony - limiter już zmniejszył współbieżność, ponów po chwili
+                time.sleep(2 ** attempt)
             else:
-                print(f"❌ Błąd Ollama API: {response.status_code}")
+                self.progress.message(f"❌ Błąd Ollama API: {response.status_code}")
                 return ""
 
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Błąd połączenia z Ollama: {e}")
-            return ""
+        return ""
 
-    def generate_blog_post(self, commit: Dict[str, str]) -> Dict[str, str]:
-        """Generuje post blogowy z commita"""
-        prompt = f"""
-Jesteś ekspertem w pisaniu postów blogowych o rozwoju oprogramowania. 
-Na podstawie poniższego commita Git, napisz interesujący post blogowy w języku polskim.
+    def record_call_stats(self, latency: float, prompt_chars: int, data: Dict[str, Any]):
+        """Dolicza czas i tokeny udanego wywołania Ollama do statystyk"""
+        with self.stats_lock:
+            self.stats['calls'] += 1
+            self.stats['latency'] += latency
+            self.stats['server_seconds'] += data.get('total_duration', 0) / 1e9
+            self.stats['prompt_eval_seconds'] += data.get('prompt_eval_duration', 0) / 1e9
+            # Tokeny są znane tylko, gdy serwer je zwrócił - liczymy znaki tylko
+            # dla takich odpowiedzi
+            if data.get('prompt_eval_count'):
+                self.stats['prompt_chars'] += prompt_chars
+                self.stats['prompt_tokens'] += data['prompt_eval_count']
+            self.stats['output_tokens'] += data.get('eval_count', 0)
 
-COMMIT:
+    def load_stats(self) -> Dict[str, Any]:
+        """Wczytuje skumulowane statystyki wywołań LLM z poprzednich przebiegów"""
+        stats_file = self.state_dir / 'stats.json'
+        if stats_file.is_file():
+            with open(stats_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def save_stats(self):
+        """Dopisuje statystyki bieżącego przebiegu do historii"""
+        with self.stats_lock:
+            if not self.stats['calls']:
+                return
+            print(f"📊 Wywołania LLM: {self.stats['calls']}, średni czas przetwarzania promptu: "
+                  f"{self.stats['prompt_eval_seconds'] / self.stats['calls'] * 1000:.0f} ms "
+                  f"({self.stats['prompt_tokens'] / self.stats['calls']:.0f} tokenów)")
+            history = self.load_stats()
+            for key, value in self.stats.items():
+                history[key] = history.get(key, 0) + value
+            history['runs'] = history.get('runs', 0) + 1
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.state_dir / 'stats.json', json.dumps(history, indent=2))
+
+    def build_commit_prompt(self, commit: Dict[str, str]) -> str:
+        """Buduje zmienną część promptu posta (dane commita) dla pojedynczego commita"""
+        return f"""COMMIT:
 Autor: {commit['author']}
 Data: {commit['date']}
 Tytuł: {commit['subject']}
-Opis: {commit['body']}
+Opis: {commit['body']}"""
 
-Napisz post blogowy który:
-1. Ma atrakcyjny tytuł (różny od tytułu commita)
-2. Wyjaśnia co zostało zrobione w przystępny sposób
-3. Opisuje dlaczego ta zmiana była ważna
-4. Ma ton conversational ale profesjonalny
-5. Jest długości 200-400 słów
+    def build_commit_title_prompt(self, commit: Dict[str, str]) -> str:
+        """Buduje zmienną część promptu tytułu dla pojedynczego commita"""
+        return f"""Commit: {commit['subject']}
+Opis: {commit['body'][:100]}..."""
 
-Zwróć tylko treść posta bez dodatkowych komentarzy.
-"""
+    def generate_blog_post(self, commit: Dict[str, str], prompt: Optional[str] = None,
+                           with_title: bool = True) -> Dict[str, Any]:
+        """Generuje post blogowy z commita (bez with_title tytuł uzupełnia etap tytułów)"""
+        prompt = prompt or self.build_commit_prompt(commit)
 
-        content = self.call_ollama(prompt)
-        if not content:
+        content = self.call_ollama(prompt, system=COMMIT_POST_SYSTEM_PROMPT)
+        llm_error = not content
+        if llm_error:
             # Fallback jeśli Ollama nie odpowiada
-            content = f"""
+            content = self.create_fallback_content(commit)
+
+        # Generuj tytuł posta
+        title = None
+        if with_title:
+            title_prompt = self.build_commit_title_prompt(commit)
+
+            title = self.call_ollama(title_prompt, system=COMMIT_TITLE_SYSTEM_PROMPT, task='title')
+            if not title or len(title) > 100:
+                title = commit['subject']
+
+        post: Dict[str, Any] = {
+            'title': title,
+            'content': content,
+            'date': commit['date'],
+            'author': commit['author'],
+            'commit_hash': commit['hash']
+        }
+        if llm_error:
+            post['llm_error'] = True
+        return post
+
+    def create_fallback_content(self, commit: Dict[str, str]) -> str:
+        """Tworzy treść posta bez udziału LLM"""
+        return f"""
 # {commit['subject']}
 
 **Autor:** {commit['author']}  
@@ -154,28 +1159,44 @@ Zwróć tylko treść posta bez dodatkowych komentarzy.
 *Ten post został wygenerowany automatycznie z historii Git.*
 """
 
-        # Generuj tytuł posta
-        title_prompt = f"""
-Na podstawie tego commita Git, zaproponuj krótki, atrakcyjny tytuł posta blogowego w języku polskim (maksymalnie 60 znaków):
-
-Commit: {commit['subject']}
-Opis: {commit['body'][:100]}...
-
-Zwróć tylko tytuł bez dodatkowych komentarzy.
-"""
-
-        title = self.call_ollama(title_prompt)
-        if not title or len(title) > 100:
-            title = commit['subject']
-
+    def create_fallback_post(self, commit: Dict[str, str]) -> Dict[str, str]:
+        """Tworzy post z szablonu zastępczego (bez wywołań LLM)"""
         return {
-            'title': title,
-            'content': content,
+            'title': commit['subject'],
+            'content': self.create_fallback_content(commit),
             'date': commit['date'],
             'author': commit['author'],
             'commit_hash': commit['hash']
         }
 
+    def create_digest_post(self, commit_group: Dict[str, Any]) -> Dict[str, Any]:
+        """Tworzy zbiorczy post z drobnymi zmianami (bez wywołań LLM)"""
+        lines = [
+            f"- {commit['subject']} ({commit['author']}, {commit['hash'][:8]})"
+            for commit in commit_group['commits']
+        ]
+        content = (
+            f"Drobne zmiany z dnia {commit_group['date']} "
+            f"({commit_group['count']} commitów):\n\n" + '\n'.join(lines)
+        )
+        return {
+            'title': f"Drobne zmiany z dnia {commit_group['date']}",
+            'date': commit_group['date'],
+            'content': content,
+            'author': self.config.get('author', 'Developer'),
+            'commit_hash': commit_group['commits'][0]['hash'],
+            'commit_count': commit_group['count']
+        }
+
+    def pending_notice(self, pending: int, complete: bool) -> str:
+        """Zwraca komunikat o trwającym generowaniu dla strony głównej"""
+        if complete and not pending:
+            return ''
+        text = f"Trwa generowanie: {pending} postów w toku"
+        if not complete:
+            text += ", kolejne commity czekają na przetworzenie"
+        return f'<p class="pending">{text}.</p>'
+
     def create_html_post(self, post: Dict[str, str]) -> str:
         """Tworzy HTML dla pojedynczego posta"""
         # Dane do linków
@@ -252,14 +1273,19 @@ Zwróć tylko tytuł bez dodatkowych komentarzy.
 """
         return template
 
-    def create_index_page(self, posts: List[Dict[str, str]]) -> str:
-        """Tworzy stronę główną bloga"""
+    def create_index_page(self, posts: List[Dict[str, str]], pending: int = 0,
+                          complete: bool = True) -> str:
+        """Tworzy stronę główną bloga
+
+        pending to liczba postów w toku; complete=False oznacza, że historia
+        nie została jeszcze w całości przejrzana i kolejne posty są nieznane.
+        """
         repo_url = self.config.get('repo_url', '')
         issues_url = self.config.get('issues_url', f'{repo_url}/issues' if repo_url else '')
         pages_url = self.config.get('pages_url', '')
         posts_html = ""
         for i, post in enumerate(posts):
-            filename = f"post_{i + 1}.html"
+            filename = post.get('file', f"post_{i + 1}.html")
             author = post['author']
             commit_hash = post['commit_hash']
             # Linki jak w create_html_post
@@ -280,11 +1306,17 @@ Zwróć tylko tytuł bez dodatkowych komentarzy.
                     {f'<a href="{history_url}" target="_blank">{date}</a>' if history_url else date} |
                     {f'<a href="{commit_url}" target="_blank">{commit_hash[:8]}</a>' if commit_url else commit_hash[:8]}
                 </div>
-                <p>{post['content'][:200]}...</p>
+                <p>{post['excerpt'] if 'excerpt' in post else post['content'][:200]}...</p>
                 <a href="{filename}">Czytaj więcej →</a>
             </article>
             """
 
+        # Data najnowszego posta zamiast bieżącej - niezmieniony blog daje identyczny plik
+        if posts:
+            last_update = max(post['date'][:16] for post in posts)
+        else:
+            last_update = datetime.now().strftime('%Y-%m-%d %H:%M')
+
         template = f"""
 <!DOCTYPE html>
 <html lang="pl">
@@ -316,12 +1348,13 @@ Zwróć tylko tytuł bez dodatkowych komentarzy.
     </div>
 
     <div class="posts">
+        {self.pending_notice(pending, complete)}
         {posts_html}
     </div>
 
     <div class="footer">
         <p>Blog wygenerowany automatycznie z historii Git przy użyciu git2blog</p>
-        <p>Ostatnia aktualizacja: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+        <p>Ostatnia aktualizacja: {last_update}</p>
     </div>
 </body>
 </html>
@@ -368,9 +1401,187 @@ Zwróć tylko tytuł bez dodatkowych komentarzy.
             
         return result
         
-    def generate_blog_post_from_group(self, commit_group):
-        """Generuje post na podstawie grupy commitów"""
-        # Przygotuj zbiorczy opis wszystkich commitów w grupie
+    def call_ollama_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Pobiera embeddingi dla listy tekstów z Ollama (/api/embed)"""
+        model, extra = self.task_model('embeddings')
+        # Embeddingi obciążają ten sam serwer co generowanie - też przechodzą przez limiter
+        for attempt in range(self.overload_retries + 1):
+            started_at = self.limiter.acquire()
+            start_ns = time.time_ns()
+            overloaded = False
+            try:
+                response = requests.post(
+                    f"{self.ollama_url}/api/embed",
+                    json=dict(extra, model=model, input=texts),
+                    timeout=self.timeout
+                )
+                overloaded = response.status_code in OVERLOAD_STATUS_CODES
+
+            except requests.exceptions.Timeout as e:
+                overloaded = True
+                self.progress.llm_call('embeddings', model, start_ns, error=f"timeout: {e}")
+                self.progress.message(f"❌ Timeout połączenia z Ollama: {e}")
+                return []
+
+            except requests.exceptions.RequestException as e:
+                self.progress.llm_call('embeddings', model, start_ns, error=str(e))
+                self.progress.message(f"❌ Błąd połączenia z Ollama: {e}")
+                return []
+
+            finally:
+                self.limiter.release(started_at, overloaded=overloaded)
+
+            if response.status_code == 200:
+                data = response.json()
+                self.progress.llm_call('embeddings', model, start_ns, data)
+                return data.get('embeddings', [])
+            self.progress.llm_call('embeddings', model, start_ns,
+                                   error=f"HTTP {response.status_code}")
+            if overloaded and attempt < self.overload_retries:
+                time.sleep(2 ** attempt)
+            else:
+                self.progress.message(f"❌ Błąd Ollama API (embeddingi): {response.status_code}")
+                return []
+
+        return []
+
+    def open_embedding_cache(self, model: str) -> Optional[sqlite3.Connection]:
+        """Otwiera cache embeddingów modelu (SQLite); uszkodzony plik jest zastępowany pustym"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        cache_file = self.state_dir / f"embeddings-{re.sub(r'[^A-Za-z0-9_.-]', '_', model)}.sqlite"
+        for _ in range(2):
+            db = sqlite3.connect(str(cache_file), timeout=60, isolation_level=None)
+            try:
+                db.execute("CREATE TABLE IF NOT EXISTS embeddings "
+                           "(hash TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+                return db
+            except sqlite3.DatabaseError as e:
+                db.close()
+                self.progress.message(f"⚠️ Uszkodzony cache embeddingów ({e}) - tworzę nowy")
+                if cache_file.exists():
+                    cache_file.unlink()
+        return None
+
+    def get_commit_embeddings(self, commits: List[Dict[str, Any]]):
+        """Zwraca znormalizowane embeddingi commitów (z cache per hash commita)
+
+        Z cache czytane są tylko wektory commitów z bieżącego okna, a nowe wektory
+        są dopisywane jedną transakcją - pamięć i IO nie rosną z długością historii.
+        """
+        grouping = self.config.get('post_grouping', {})
+        model = self.task_model('embeddings')[0]
+        batch_size = grouping.get('embedding_batch_size', 32)
+
+        cache = {}
+        db = self.open_embedding_cache(model)
+        try:
+            if db is not None:
+                hashes = [commit['hash'] for commit in commits]
+                try:
+                    for i in range(0, len(hashes), 500):
+                        part = hashes[i:i + 500]
+                        placeholders = ','.join('?' * len(part))
+                        rows = db.execute(
+                            f"SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})",
+                            part
+                        )
+                        for commit_hash, vector in rows:
+                            cache[commit_hash] = np.frombuffer(vector, dtype=np.float32)
+                except sqlite3.DatabaseError as e:
+                    self.progress.message(
+                        f"⚠️ Nie można odczytać cache embeddingów ({e}) - pomijam cache")
+                    cache = {}
+
+            missing = [commit for commit in commits if commit['hash'] not in cache]
+            if missing and self.plan_estimates is not None:
+                # Tryb --plan: tylko embeddingi z cache, brakujące wywołania są szacowane
+                self.plan_estimates['embedding_calls'] += -(-len(missing) // batch_size)
+                self.plan_estimates['prompt_chars'] += sum(len(c['subject']) + len(c['body'])
+                                                           for c in missing)
+                return None
+            for i in range(0, len(missing), batch_size):
+                batch = missing[i:i + batch_size]
+                vectors = self.call_ollama_embeddings(
+                    [f"{c['subject']}\n{c['body']}".strip() for c in batch])
+                if len(vectors) != len(batch):
+                    return None
+                for commit, vector in zip(batch, vectors):
+                    cache[commit['hash']] = np.asarray(vector, dtype=np.float32)
+
+            if missing and db is not None:
+                try:
+                    with db:
+                        db.execute("BEGIN IMMEDIATE")
+                        db.executemany(
+                            "INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)",
+                            [(commit['hash'], cache[commit['hash']].tobytes())
+                             for commit in missing]
+                        )
+                except sqlite3.DatabaseError as e:
+                    self.progress.message(f"⚠️ Nie można zapisać cache embeddingów: {e}")
+        finally:
+            if db is not None:
+                db.close()
+
+        matrix = np.stack([cache[commit['hash']] for commit in commits])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def group_commits_by_similarity(self, commits):
+        """Grupuje commity o podobnej treści (embeddingi, okno czasowe)"""
+        grouping = self.config.get('post_grouping', {})
+        threshold = grouping.get('similarity_threshold', 0.75)
+        window = grouping.get('window_days', 7) * 86400
+        max_size = grouping.get('max_commits_per_post', 10)
+
+        if np is None:
+            self.progress.message("⚠️ Grupowanie semantyczne wymaga numpy - grupuję według dni")
+            return self.group_commits_by_day(commits)
+        if not commits:
+            return []
+
+        vectors = self.get_commit_embeddings(commits)
+        if vectors is None and self.plan_estimates is not None:
+            self.progress.message("📋 Brak embeddingów w cache - liczba grup szacowana według dni")
+            return self.group_commits_by_day(commits)
+        if vectors is None:
+            self.progress.message("⚠️ Nie udało się pobrać embeddingów - grupuję według dni")
+            return self.group_commits_by_day(commits)
+
+        timestamps = [parse_commit_date(commit['date']).timestamp() for commit in commits]
+        clusters = []  # [indeksy commitów, suma wektorów, ostatni znacznik czasu]
+        active = []
+        for i, vector in enumerate(vectors):
+            # Porównuj tylko z otwartymi grupami z okna czasowego - koszt prawie liniowy
+            active = [c for c in active if abs(clusters[c][2] - timestamps[i]) <= window
+                      and len(clusters[c][0]) < max_size]
+            best = None
+            if active:
+                centroids = np.stack([clusters[c][1] for c in active])
+                centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+                similarities = centroids @ vector
+                if similarities.max() >= threshold:
+                    best = active[int(similarities.argmax())]
+            if best is None:
+                clusters.append([[i], vector.copy(), timestamps[i]])
+                active.append(len(clusters) - 1)
+            else:
+                clusters[best][0].append(i)
+                clusters[best][1] += vector
+                clusters[best][2] = timestamps[i]
+
+        result = []
+        for indices, _, _ in clusters:
+            group = [commits[i] for i in indices]
+            result.append({
+                'date': group[0]['date'].split()[0],  # Data najnowszego commita w grupie
+                'commits': group,
+                'count': len(group)
+            })
+        return result
+
+    def format_commits_summary(self, commit_group: Dict[str, Any]) -> str:
+        """Przygotowuje zbiorczy opis wszystkich commitów w grupie"""
         commits_summary = ""
         for commit in commit_group['commits']:
             commits_summary += f"- {commit['subject']}\n"
@@ -378,49 +1589,806 @@ Zwróć tylko tytuł bez dodatkowych komentarzy.
                 # Dodaj wcięcie do treści commita
                 body_indented = '  ' + commit['body'].replace('\n', '\n  ')
                 commits_summary += f"{body_indented}\n"
-        
-        # Przygotuj prompt dla modelu
-        prompt = f"""Napisz post na blog na podstawie poniższych commitów z dnia {commit_group['date']}. 
-        Liczba commitów: {commit_group['count']}
-        
-        Commity:
-        {commits_summary}
-        
-        Napisz szczegółowy post opisujący zmiany wprowadzone w tych commitach. 
-        Uwzględnij kontekst techniczny i biznesowy zmian.
-        Pisz w języku polskim, w stylu profesjonalnego bloga technicznego.
-        """
-        
+        return commits_summary
+
+    def build_group_prompt(self, commit_group: Dict[str, Any]) -> str:
+        """Buduje zmienną część promptu posta dla grupy commitów"""
+        return f"""Data: {commit_group['date']}
+Liczba commitów: {commit_group['count']}
+
+Commity:
+{self.format_commits_summary(commit_group)}"""
+
+    def generate_blog_post_from_group(self, commit_group, prompt: Optional[str] = None,
+                                      with_title: bool = True):
+        """Generuje post z grupy commitów (bez with_title tytuł uzupełnia etap tytułów)"""
+        prompt = prompt or self.build_group_prompt(commit_group)
+
         try:
             # Wywołaj model LLM
-            content = self.call_ollama(prompt)
+            content = self.call_ollama(prompt, system=GROUP_POST_SYSTEM_PROMPT, task='summary')
             
             # Wygeneruj tytuł
-            title_prompt = f"Napisz krótki, zwięzły tytuł dla posta o następującej treści, nie dłuższy niż 10 słów: {content[:500]}..."
-            title = self.call_ollama(title_prompt)
+            title = None
+            if with_title:
+                title = self.call_ollama(f"{content[:500]}...", system=GROUP_TITLE_SYSTEM_PROMPT,
+                                         task='title')
             
             # Przygotuj post
-            return {
+            post = {
                 'title': title,
                 'date': commit_group['date'],
                 'content': content,
                 'author': self.config.get('author', 'Developer'),
+                'commit_hash': commit_group['commits'][0]['hash'],
                 'commit_count': commit_group['count']
             }
+            if not content:
+                post['llm_error'] = True
+            return post
             
         except Exception as e:
-            print(f"❌ Błąd podczas generowania posta: {e}")
+            self.progress.message(f"❌ Błąd podczas generowania posta: {e}")
             # Zwróć podstawowy post w przypadku błędu
             return {
                 'title': f"Aktualizacja z dnia {commit_group['date']}",
                 'date': commit_group['date'],
-                'content': f"W tym dniu wprowadzono {commit_group['count']} zmian.\n\n{commits_summary}",
+                'content': f"W tym dniu wprowadzono {commit_group['count']} zmian.\n\n"
+                           f"{self.format_commits_summary(commit_group)}",
                 'author': self.config.get('author', 'Developer'),
-                'commit_count': commit_group['count']
+                'commit_hash': commit_group['commits'][0]['hash'],
+                'commit_count': commit_group['count'],
+                'llm_error': True
             }
 
+    def build_jobs(self, commits: List[Dict[str, Any]],
+                   trivial_commits: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Buduje listę zadań generowania postów według metody grupowania"""
+        grouping_method = self.config.get('post_grouping', {}).get('method', 'commit')
+        jobs = []
+
+        if grouping_method == 'day':
+            # Grupuj commity według dni
+            commit_groups = self.group_commits_by_day(commits)
+            self.progress.message(f"📅 Grupowanie według dni: {len(commit_groups)} grup")
+            for group in commit_groups:
+                jobs.append({'kind': 'group', 'group': group, 'date': group['date'],
+                             'label': f"Dzień {group['date']} ({group['count']} commitów)"})
+
+        elif grouping_method == 'count':
+            # Grupuj commity po określonej liczbie
+            commits_per_post = self.config.get('post_grouping', {}).get('commits_per_post', 3)
+            commit_groups = self.group_commits_by_count(commits, commits_per_post)
+            self.progress.message(
+                f"🔢 Grupowanie po {commits_per_post} commitów: {len(commit_groups)} grup")
+            for i, group in enumerate(commit_groups):
+                jobs.append({'kind': 'group', 'group': group, 'date': group['date'],
+                             'label': f"Grupa {i + 1} ({group['count']} commitów)"})
+        elif grouping_method == 'semantic':
+            # Grupuj commity o podobnej tematyce
+            commit_groups = self.group_commits_by_similarity(commits)
+            self.progress.message(f"🧠 Grupowanie semantyczne: {len(commit_groups)} grup")
+            for i, group in enumerate(commit_groups):
+                jobs.append({'kind': 'group', 'group': group, 'date': group['date'],
+                             'label': f"Temat {i + 1} ({group['count']} commitów)"})
+        else:
+            # Standardowe generowanie - jeden commit, jeden post
+            for commit in commits:
+                jobs.append({'kind': 'commit', 'commit': commit, 'date': commit['date'],
+                             'label': commit['subject'][:50]})
+
+        # Trywialne commity: pomiń, zbierz w posty zbiorcze lub użyj szablonu bez LLM
+        action = self.config.get('trivial_commits', {}).get('action', 'digest')
+        if trivial_commits and action == 'digest':
+            for group in self.group_commits_by_day(trivial_commits):
+                jobs.append({'kind': 'digest', 'group': group, 'date': group['date'],
+                             'label': f"Drobne zmiany {group['date']} ({group['count']} commitów)"})
+        elif trivial_commits and action == 'fallback':
+            for commit in trivial_commits:
+                jobs.append({'kind': 'fallback', 'commit': commit, 'date': commit['date'],
+                             'label': commit['subject'][:50]})
+
+        return jobs
+
+    def generate_post_for_job(self, job: Dict[str, Any], with_title: bool = True) -> Dict[str, Any]:
+        """Generuje post dla pojedynczego zadania"""
+        if job['kind'] == 'group':
+            return self.generate_blog_post_from_group(job['group'], job.get('prompt'), with_title)
+        if job['kind'] == 'digest':
+            return self.create_digest_post(job['group'])
+        if job['kind'] == 'fallback':
+            return self.create_fallback_post(job['commit'])
+        return self.generate_blog_post(job['commit'], job.get('prompt'), with_title)
+
+    def build_title_entry(self, job: Dict[str, Any], post: Dict[str, Any]) -> str:
+        """Opis posta dla zbiorczego promptu tytułów"""
+        if job['kind'] == 'commit':
+            return self.build_commit_title_prompt(job['commit'])
+        return f"Treść: {post['content'][:500]}..."
+
+    def parse_titles(self, answer: str, count: int) -> List[Optional[str]]:
+        """Wyciąga tytuły z odpowiedzi (lista JSON lub numerowane linie); None dla niepoprawnych"""
+        titles = None
+        match = re.search(r'\[.*\]', answer, re.DOTALL)
+        if match:
+            try:
+                parsed = json.loads(match.group(0))
+                if isinstance(parsed, list):
+                    titles = parsed
+            except ValueError:
+                pass
+        if titles is None:
+            numbered = re.findall(r'^\s*(\d+)[.)]\s*(.+?)\s*$', answer, re.MULTILINE)
+            titles = [title for _, title in numbered]
+
+        # Przy złej liczbie tytułów nie da się ich przypisać do postów
+        if len(titles) != count:
+            return [None] * count
+
+        result = []
+        for title in titles:
+            title = title.strip().strip('"\'„”').strip() if isinstance(title, str) else ''
+            result.append(title if title and len(title) <= 60 else None)
+        return result
+
+    def generate_titles(self, items: List[Tuple[Dict[str, Any], Dict[str, Any]]]):
+        """Uzupełnia tytuły wielu postów jednym zapytaniem, ponawiając tylko nieudane"""
+        missing = list(range(len(items)))
+        for _ in range(self.config.get('titles', {}).get('retries', 2) + 1):
+            if not missing:
+                break
+            entries = [f"{n}. {self.build_title_entry(*items[i])}"
+                       for n, i in enumerate(missing, start=1)]
+            prompt = f"Liczba postów: {len(entries)}\n\n" + '\n\n'.join(entries)
+            answer = self.call_ollama(prompt, system=TITLES_BATCH_SYSTEM_PROMPT, task='title')
+
+            titles = self.parse_titles(answer, len(missing))
+            for i, title in zip(missing, titles):
+                if title:
+                    items[i][1]['title'] = title
+            missing = [i for i, title in zip(missing, titles) if not title]
+
+        # Tytuły zastępcze dla postów, których model nie zatytułował poprawnie
+        for i in missing:
+            job, post = items[i]
+            if job['kind'] == 'commit':
+                post['title'] = job['commit']['subject']
+            else:
+                post['title'] = f"Aktualizacja z dnia {post['date']}"
+
+    def with_titles(self,
+                    results: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+                    ) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Etap tytułów: uzupełnia brakujące tytuły partiami po titles.batch_size
+
+        Pierwsza partia jest nie większa niż publish.batch_size, żeby pierwsze posty
+        trafiły na stronę jak najszybciej. Niepełna partia jest opróżniana, gdy czeka
+        dłużej niż titles.max_wait sekund (także przy sygnale (None, None) z run_jobs).
+        """
+        max_wait = self.config.get('titles', {}).get('max_wait', 15)
+        limit = min(self.title_batch_size, self.config.get('publish', {}).get('batch_size', 5))
+        batch: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        batch_started = 0.0
+        for job, post in results:
+            if job is None or post is None:
+                # Brak nowych wyników - nie przetrzymuj gotowych postów zbyt długo
+                if batch and time.monotonic() - batch_started >= max_wait:
+                    self.generate_titles(batch)
+                    yield from batch
+                    batch = []
+                    limit = self.title_batch_size
+                continue
+            if post.get('title') is not None:
+                yield job, post
+                continue
+            if not batch:
+                batch_started = time.monotonic()
+            batch.append((job, post))
+            if len(batch) >= limit or time.monotonic() - batch_started >= max_wait:
+                self.generate_titles(batch)
+                yield from batch
+                batch = []
+                limit = self.title_batch_size
+        if batch:
+            self.generate_titles(batch)
+            yield from batch
+
+    def job_key(self, job: Dict[str, Any], by_patch_id: bool = True) -> str:
+        """Zwraca stabilny klucz zadania (rodzaj, commity, model)
+
+        Posty generowane przez LLM są identyfikowane przez patch-id i wiadomość commitów,
+        więc przetrwają rebase i cherry-pick. Posty bez LLM używają hashy commitów.
+        """
+        commits = job['group']['commits'] if 'group' in job else [job['commit']]
+        if by_patch_id and job['kind'] in ('commit', 'group'):
+            identities = [self.commit_identity(commit) for commit in commits]
+        else:
+            identities = [commit['hash'] for commit in commits]
+        key = {
+            'kind': job['kind'],
+            'commits': identities,
+            'model': self.task_model('summary' if job['kind'] == 'group' else 'body')[0]
+        }
+        if self.task_model('title')[0] != key['model']:
+            key['title_model'] = self.task_model('title')[0]
+        raw = json.dumps(key, sort_keys=True)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """Wczytuje manifest poprzedniego generowania"""
+        manifest_file = self.state_dir / 'manifest.json'
+        if manifest_file.is_file():
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'posts': {}, 'pending': []}
+
+    def load_stored_post(self, key: str) -> Optional[Dict[str, Any]]:
+        """Wczytuje wygenerowany wcześniej post z katalogu stanu"""
+        post_file = self.state_dir / 'posts' / f"{key}.json"
+        if post_file.is_file():
+            with open(post_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    def store_post(self, key: str, post: Dict[str, Any]):
+        """Zapisuje wygenerowany post w katalogu stanu"""
+        posts_dir = self.state_dir / 'posts'
+        posts_dir.mkdir(parents=True, exist_ok=True)
+        write_atomic(posts_dir / f"{key}.json", json.dumps(post, ensure_ascii=False))
+
+    def refresh_reused_post(self, job: Dict[str, Any], post: Dict[str, Any]) -> Dict[str, Any]:
+        """Aktualizuje hash, datę i autora ponownie użytego posta do bieżących commitów"""
+        commits = job['group']['commits'] if 'group' in job else [job['commit']]
+        post['commit_hash'] = commits[0]['hash']
+        post['date'] = job['date']
+        if 'commit' in job:
+            post['author'] = job['commit']['author']
+        return post
+
+    def write_post_page(self, job: Dict[str, Any], post: Dict[str, Any]):
+        """Zapisuje stronę HTML posta"""
+        write_atomic(self.output_dir / job['file'], self.create_html_post(post))
+
+    def post_summary(self, job: Dict[str, Any], post: Dict[str, Any]) -> Dict[str, Any]:
+        """Zwraca skrót posta potrzebny stronie głównej (bez pełnej treści)"""
+        return {
+            'key': job['key'],
+            'number': job['number'],
+            'file': job['file'],
+            'title': post['title'],
+            'date': post['date'],
+            'author': post['author'],
+            'commit_hash': post['commit_hash'],
+            'excerpt': post['content'][:200]
+        }
+
+    def iter_jobs(self, chunks: Iterable[List[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """Zamienia strumień partii commitów na strumień numerowanych zadań"""
+        number = 0
+        carry: List[Dict[str, Any]] = []
+        seen_keys = set()
+        chunks = iter(chunks)
+        chunk = next(chunks, None)
+        while chunk is not None:
+            next_chunk = next(chunks, None)
+            commits = carry + chunk
+            carry = []
+            if next_chunk is not None:
+                # Commity z ostatniego dnia partii przechodzą do następnej,
+                # żeby grupy dzienne nie były dzielone na granicy partii
+                last_day = commits[-1]['date'][:10]
+                split = len(commits)
+                while split > 0 and commits[split - 1]['date'][:10] == last_day:
+                    split -= 1
+                if split > 0:
+                    commits, carry = commits[:split], commits[split:]
+
+            # Patch-id pozwala ponownie użyć postów po rebase i cherry-pick
+            if self.config.get('cache', {}).get('patch_id', True):
+                patch_ids = self.get_patch_ids([commit['hash'] for commit in commits])
+                for commit in commits:
+                    commit['patch_id'] = patch_ids.get(commit['hash'])
+
+            # Odfiltruj trywialne commity przed wywołaniami LLM
+            regular, trivial = self.filter_trivial_commits(commits)
+            if trivial:
+                self.progress.message(f"🧹 Trywialne commity: {len(trivial)} (bez LLM)")
+
+            jobs = self.build_jobs(regular, trivial)
+            # Najnowsze commity i grupy najpierw - trafiają na stronę jako pierwsze
+            jobs.sort(key=lambda job: job['date'][:19], reverse=True)
+            for job in jobs:
+                job['key'] = self.job_key(job)
+                # Ta sama zmiana dwukrotnie w historii (np. cherry-pick na inną gałąź)
+                if job['key'] in seen_keys:
+                    job['key'] = self.job_key(job, by_patch_id=False)
+                # Te same commity drugi raz (np. powtórzony hash) - post już jest w strumieniu
+                if job['key'] in seen_keys:
+                    continue
+                seen_keys.add(job['key'])
+                seen_keys.add(self.job_key(job, by_patch_id=False))
+                number += 1
+                job['number'] = number
+                # Nazwa pliku z klucza zadania - nowe commity nie przesuwają istniejących postów
+                job['file'] = f"post_{job['key'][:12]}.html"
+                yield job
+            chunk = next_chunk
+
+    def generate_traced_post(self, job: Dict[str, Any], with_title: bool = True) -> Dict[str, Any]:
+        """Generuje post zadania w spanie telemetrii"""
+        with self.progress.job_span(job):
+            return self.generate_post_for_job(job, with_title)
+
+    def run_jobs(self, jobs: Iterable[Dict[str, Any]], pending: Dict[str, Dict[str, Any]],
+                 heartbeat: Optional[float] = None
+                 ) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Generuje posty dla strumienia zadań w ograniczonym oknie zadań w toku
+
+        Zadania w toku są zapisywane w słowniku pending (klucz zadania -> zadanie).
+        Z heartbeat, gdy przez tyle sekund nic się nie kończy, zwracana jest para
+        (None, None) - kolejny etap może wtedy opróżnić swoje bufory.
+        """
+        window = self.limiter.maximum * 2
+        with ThreadPoolExecutor(max_workers=self.limiter.maximum) as executor:
+            futures = {}
+            for job in jobs:
+                # Zadanie o tym samym kluczu jest już w toku - drugi wynik nadpisałby pierwszy
+                if job['key'] in pending:
+                    continue
+
+                # Posty gotowe w poprzednim (np. przerwanym) przebiegu nie są generowane ponownie
+                post = self.load_stored_post(job['key'])
+                if post is not None:
+                    job['cached'] = True
+                    self.progress.job_cached(job)
+                    yield job, post
+                    continue
+
+                # Zadania czekają na limiter, który steruje liczbą zapytań w toku
+                pending[job['key']] = job
+                self.progress.job_queued(job)
+                future = executor.submit(self.generate_traced_post, job, self.title_batch_size <= 1)
+                futures[future] = job
+                while len(futures) >= window:
+                    yield from self.collect_finished(futures, pending, heartbeat)
+
+            while futures:
+                yield from self.collect_finished(futures, pending, heartbeat)
+
+    def collect_finished(self, futures: Dict[Any, Dict[str, Any]],
+                         pending: Dict[str, Dict[str, Any]],
+                         heartbeat: Optional[float] = None
+                         ) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Czeka na zakończone zadania; po heartbeat sekundach bez wyników zwraca (None, None)"""
+        done, _ = wait(futures, timeout=heartbeat, return_when=FIRST_COMPLETED)
+        if not done:
+            yield None, None
+        for future in done:
+            job = futures.pop(future)
+            del pending[job['key']]
+            yield job, future.result()
+
+    def write_posts(self, results: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+                    pending: Dict[str, Dict[str, Any]], stream: Optional[Dict[str, bool]] = None):
+        """Zapisuje gotowe posty, publikując stronę główną partiami
+
+        pending to zadania w toku (klucz zadania -> zadanie). stream['done'] mówi,
+        czy strumień zadań został już wyczerpany; bez stream wszystkie zadania są znane.
+        """
+        publish = self.config.get('publish', {})
+        progressive = publish.get('progressive', True)
+        batch_size = publish.get('batch_size', 5) if progressive else float('inf')
+        # Każda publikacja przepisuje cały indeks, więc ograniczamy ich częstotliwość
+        min_interval = publish.get('min_interval', 10)
+
+        summaries: List[Dict[str, Any]] = []
+        unpublished = 0
+        last_publish = float('-inf')
+        for job, post in results:
+            # Post mógł powstać dla commita sprzed rebase lub cherry-pick
+            post = self.refresh_reused_post(job, post)
+            if not post.get('llm_error'):
+                self.store_post(job['key'], post)
+            self.write_post_page(job, post)
+            summary = self.post_summary(job, post)
+            del post
+
+            # Skróty posortowane według numeru posta (zadania kończą się w różnej kolejności)
+            position = len(summaries)
+            while position > 0 and summaries[position - 1]['number'] > summary['number']:
+                position -= 1
+            summaries.insert(position, summary)
+
+            self.progress.post_written(job)
+
+            # Publikuj partiami tylko nowo wygenerowane posty - posty z cache
+            # nie zmieniają niczego, co warto pokazać przed końcem przebiegu
+            if not job.get('cached'):
+                unpublished += 1
+            if unpublished >= batch_size and time.monotonic() - last_publish >= min_interval:
+                self.publish_progress(summaries, pending.values(),
+                                      complete=stream is None or stream['done'])
+                unpublished = 0
+                last_publish = time.monotonic()
+
+        # Utwórz stronę główną
+        self.progress.message("📄 Tworzę stronę główną...")
+        self.publish_progress(summaries, pending.values())
+        if not pending:
+            self.remove_stale_posts({summary['file'] for summary in summaries})
+
+    def remove_stale_posts(self, files: set):
+        """Usuwa strony postów, których nie ma już w historii (np. po zmianie modelu)"""
+        for path in self.output_dir.glob('post_*.html'):
+            if path.name not in files:
+                path.unlink()
+
+    def publish_progress(self, summaries: List[Dict[str, Any]], pending: Iterable[Dict[str, Any]],
+                         complete: bool = True):
+        """Atomowo przepisuje stronę główną i manifest z gotowymi postami
+
+        pending to tylko zadania w toku (okno potoku strumieniowego). Dopóki
+        historia nie jest przejrzana do końca (complete=False), liczba
+        pozostałych postów nie jest znana i manifest zapisuje to wprost.
+        """
+        pending = [
+            {'key': job['key'], 'file': job['file'], 'label': job['label']}
+            for job in sorted(pending, key=lambda job: job['number'])
+        ]
+
+        write_atomic(self.output_dir / 'index.html',
+                     self.create_index_page(summaries, pending=len(pending), complete=complete))
+
+        manifest = {
+            'posts': {
+                summary['key']: {k: summary[k]
+                                 for k in ('file', 'title', 'date', 'author', 'commit_hash')}
+                for summary in summaries
+            },
+            'pending': pending,
+            'complete': complete,
+            'updated': datetime.now().isoformat(timespec='seconds')
+        }
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.state_dir / 'manifest.json',
+                     json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    def generation_config_hash(self) -> str:
+        """Zwraca hash ustawień wpływających na treść generowanych postów"""
+        raw = json.dumps({
+            'models': {task: self.task_model(task) for task in LLM_TASKS},
+            'system_prompts': [COMMIT_POST_SYSTEM_PROMPT, GROUP_POST_SYSTEM_PROMPT,
+                               COMMIT_TITLE_SYSTEM_PROMPT, GROUP_TITLE_SYSTEM_PROMPT]
+        }, sort_keys=True)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+    def open_queue(self, queue_path: str) -> WorkQueue:
+        """Otwiera kolejkę zadań z ustawieniami z sekcji queue"""
+        settings = self.config.get('queue', {})
+        return WorkQueue(
+            queue_path,
+            lease_seconds=settings.get('lease_seconds', 600),
+            max_attempts=settings.get('max_attempts', 3)
+        )
+
+    def enqueue_jobs(self, queue_path: str):
+        """Koordynator: dodaje zadania generowania do kolejki SQLite"""
+        if not os.path.exists('.git'):
+            print("❌ Nie znajdujesz się w repozytorium Git!")
+            return
+
+        def jobs_with_prompts():
+            for job in self.iter_jobs(self.iter_commit_chunks(self.config.get('commit_limit', 50))):
+                if job['kind'] == 'commit':
+                    job['prompt'] = self.build_commit_prompt(job['commit'])
+                elif job['kind'] == 'group':
+                    job['prompt'] = self.build_group_prompt(job['group'])
+                yield job
+
+        queue = self.open_queue(queue_path)
+        count = queue.enqueue(jobs_with_prompts(), self.generation_config_hash())
+        counts = queue.counts()
+        print(f"📥 Kolejka {queue_path}: {count} zadań "
+              f"(gotowe: {counts.get('done', 0)}, do wygenerowania: {counts.get('pending', 0)})")
+
+    def run_worker(self, queue_path: str):
+        """Worker: pobiera zadania z kolejki, generuje posty i zapisuje wyniki"""
+        queue = self.open_queue(queue_path)
+        config_hash = self.generation_config_hash()
+        poll_interval = self.config.get('queue', {}).get('poll_interval', 10)
+
+        db_retries = self.config.get('queue', {}).get('db_retries', 10)
+
+        def retry(operation, *args):
+            # Baza może być chwilowo zablokowana przez koordynatora lub inne węzły
+            for attempt in range(db_retries + 1):
+                try:
+                    return operation(*args)
+                except sqlite3.OperationalError as e:
+                    if attempt == db_retries:
+                        raise
+                    print(f"⚠️ Kolejka niedostępna ({e}), ponawiam za {poll_interval} s")
+                    time.sleep(poll_interval)
+
+        def work(slot: int) -> int:
+            worker = f"{socket.gethostname()}:{os.getpid()}:{slot}"
+            completed = 0
+            while True:
+                job = retry(queue.claim, worker, config_hash)
+                if job is None:
+                    # Czekaj tylko, jeśli inne dzierżawy mogą jeszcze wygasnąć
+                    if not retry(queue.counts).get('leased'):
+                        return completed
+                    time.sleep(poll_interval)
+                    continue
+
+                try:
+                    post = self.generate_post_for_job(job)
+                except Exception as e:
+                    print(f"❌ Błąd podczas generowania posta: {e}")
+                    post = {'llm_error': True}
+
+                if post.get('llm_error'):
+                    retry(queue.release, job['key'], worker)
+                    time.sleep(poll_interval)
+                elif retry(queue.complete, job['key'], worker, post):
+                    completed += 1
+                    print(f"⏳ [{worker}] {job['label']}")
+
+        print(f"👷 Worker uruchomiony (kolejka: {queue_path}, model: {self.model})")
+        self.preload_models()
+        with ThreadPoolExecutor(max_workers=self.limiter.maximum) as executor:
+            completed = sum(executor.map(work, range(self.limiter.maximum)))
+        self.save_stats()
+        print(f"✅ Worker zakończył pracę: {completed} postów")
+
+    def assemble_blog(self, queue_path: str):
+        """Składa blog z wyników zapisanych w kolejce"""
+        queue = self.open_queue(queue_path)
+        self.output_dir.mkdir(exist_ok=True)
+        pending = {}
+
+        def finished():
+            for job, post in queue.results():
+                if post is None:
+                    pending[job['key']] = job
+                else:
+                    yield job, post
+
+        self.write_posts(finished(), pending)
+        if pending:
+            print(f"⚠️ Niegotowe zadania w kolejce: {len(pending)}")
+        print(f"✅ Blog złożony w katalogu: {self.output_dir}")
+
+    def collect_site_files(self) -> Dict[str, str]:
+        """Zwraca hashe SHA-256 plików bloga (bez katalogu stanu .git2blog)"""
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(str(self.output_dir)):
+            if Path(dirpath) == self.output_dir and self.state_dir.name in dirnames:
+                dirnames.remove(self.state_dir.name)
+            for filename in filenames:
+                path = Path(dirpath) / filename
+                with open(path, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                files[path.relative_to(self.output_dir).as_posix()] = digest
+        return files
+
+    def local_deployer(self, target: str):
+        """Zwraca funkcje wysyłania i usuwania plików w katalogu docelowym"""
+        root = Path(target)
+
+        def upload(relative: str):
+            destination = root / relative
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = destination.with_name(f".{destination.name}.tmp")
+            shutil.copy2(str(self.output_dir / relative), str(tmp_path))
+            os.replace(str(tmp_path), str(destination))
+
+        def remove(relative: str):
+            if (root / relative).is_file():
+                (root / relative).unlink()
+
+        return upload, remove
+
+    def s3_deployer(self, target: str):
+        """Zwraca funkcje wysyłania i usuwania obiektów w S3 (lub zgodnym, np. MinIO)"""
+        if boto3 is None:
+            raise RuntimeError("Wdrażanie do S3 wymaga boto3 (pip install git2blog[s3])")
+        settings = self.config.get('deploy', {})
+        bucket, _, prefix = target[len('s3://'):].partition('/')
+        prefix = prefix.strip('/')
+        client = boto3.client('s3', endpoint_url=settings.get('endpoint_url'),
+                              region_name=settings.get('region'))
+
+        def key_for(relative: str) -> str:
+            return f"{prefix}/{relative}" if prefix else relative
+
+        def upload(relative: str):
+            content_type = mimetypes.guess_type(relative)[0] or 'application/octet-stream'
+            client.upload_file(str(self.output_dir / relative), bucket, key_for(relative),
+                               ExtraArgs={'ContentType': content_type})
+
+        def remove(relative: str):
+            client.delete_object(Bucket=bucket, Key=key_for(relative))
+
+        return upload, remove
+
+    def invalidate_paths(self, paths: List[str]):
+        """Zgłasza zmienione ścieżki do unieważnienia w CDN (deploy.invalidate_url)"""
+        url = self.config.get('deploy', {}).get('invalidate_url')
+        if not url or not paths:
+            return
+        urls = [f"/{path}" for path in paths]
+        if 'index.html' in paths:
+            urls.append('/')
+        try:
+            response = requests.post(url, json={'paths': urls}, timeout=30)
+            if response.status_code >= 300:
+                print(f"❌ Błąd unieważniania ścieżek: {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Błąd unieważniania ścieżek: {e}")
+
+    def deploy_site(self, target: Optional[str] = None):
+        """Wdraża tylko dodane, zmienione i usunięte pliki bloga (manifest hashy)"""
+        settings = self.config.get('deploy', {})
+        target = target or settings.get('target')
+        if not target:
+            print("❌ Brak celu wdrożenia (--deploy CEL lub deploy.target)")
+            return
+
+        manifest_file = self.state_dir / 'deploy-manifest.json'
+        manifests = {}
+        if manifest_file.is_file():
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifests = json.load(f)
+        previous = manifests.get(target, {})
+        current = self.collect_site_files()
+
+        changed = [path for path, digest in current.items() if previous.get(path) != digest]
+        deleted = [path for path in previous if path not in current]
+        if target.startswith('s3://'):
+            upload, remove = self.s3_deployer(target)
+        else:
+            upload, remove = self.local_deployer(target)
+            # Pliki usunięte ręcznie z katalogu docelowego są wysyłane ponownie
+            changed += [path for path in current
+                        if path not in changed and not (Path(target) / path).is_file()]
+
+        if not changed and not deleted:
+            print(f"✅ Brak zmian do wdrożenia ({target})")
+            return
+
+        print(f"🚚 Wdrażam do {target}: {len(changed)} zmienionych, "
+              f"{len(deleted)} usuniętych plików")
+        deployed = dict(previous)
+        done = []
+        with ThreadPoolExecutor(max_workers=settings.get('workers', 8)) as executor:
+            futures = {executor.submit(upload, path): path for path in changed}
+            futures.update({executor.submit(remove, path): path for path in deleted})
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    # Nieudane pliki nie trafiają do manifestu - zostaną wysłane następnym razem
+                    print(f"❌ Błąd wdrażania {path}: {e}")
+                    continue
+                if path in current:
+                    deployed[path] = current[path]
+                else:
+                    deployed.pop(path, None)
+                done.append(path)
+
+        manifests[target] = deployed
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        write_atomic(manifest_file, json.dumps(manifests, indent=2, sort_keys=True))
+
+        self.invalidate_paths(sorted(done))
+        print(f"✅ Wdrożono {len(done)}/{len(changed) + len(deleted)} plików")
+
+    def plan_build(self) -> Dict[str, Any]:
+        """Szacuje wywołania LLM, tokeny i czas generowania bez wywoływania modelu"""
+        plan: Dict[str, Any] = {'commits': 0, 'jobs': 0, 'cached': 0, 'without_llm': 0,
+                                'llm_jobs': 0, 'llm_calls': 0}
+        prompt_chars = 0
+
+        def counted_chunks():
+            for chunk in self.iter_commit_chunks(self.config.get('commit_limit', 50)):
+                plan['commits'] += len(chunk)
+                yield chunk
+
+        title_entries = 0
+        # Klasyfikacja i embeddingi w iter_jobs są tylko szacowane, bez wywołań modelu
+        estimates = {'classification_calls': 0, 'embedding_calls': 0, 'prompt_chars': 0}
+        self.plan_estimates = estimates
+        try:
+            for job in self.iter_jobs(counted_chunks()):
+                plan['jobs'] += 1
+                if (self.state_dir / 'posts' / f"{job['key']}.json").is_file():
+                    plan['cached'] += 1
+                elif job['kind'] == 'commit':
+                    plan['llm_jobs'] += 1
+                    prompt_chars += (len(COMMIT_POST_SYSTEM_PROMPT)
+                                     + len(self.build_commit_prompt(job['commit'])))
+                    title_entries += len(self.build_commit_title_prompt(job['commit']))
+                elif job['kind'] == 'group':
+                    plan['llm_jobs'] += 1
+                    prompt_chars += (len(GROUP_POST_SYSTEM_PROMPT)
+                                     + len(self.build_group_prompt(job['group'])))
+                    # Prompt tytułu grupy zawiera do 500 znaków wygenerowanej treści
+                    title_entries += 500
+                else:
+                    plan['without_llm'] += 1
+        finally:
+            self.plan_estimates = None
+
+        # Jedno wywołanie na post dla treści i jedno na partię tytułów
+        batch = max(1, self.title_batch_size)
+        title_calls = -(-plan['llm_jobs'] // batch)
+        generation_calls = plan['llm_jobs'] + title_calls
+        prompt_chars += title_entries + title_calls * len(TITLES_BATCH_SYSTEM_PROMPT)
+
+        # Klasyfikacja i embeddingi, które generowanie wykona przed postami
+        plan['classification_calls'] = estimates['classification_calls']
+        plan['embedding_calls'] = estimates['embedding_calls']
+        plan['llm_calls'] = (generation_calls + plan['classification_calls']
+                             + plan['embedding_calls'])
+        prompt_chars += estimates['prompt_chars']
+
+        # Historia z poprzednich przebiegów albo ostrożne wartości domyślne
+        history = self.load_stats()
+        calls = history.get('calls', 0)
+        plan['history_calls'] = calls
+        chars_per_token = 4.0
+        if history.get('prompt_tokens'):
+            chars_per_token = history['prompt_chars'] / history['prompt_tokens']
+        output_per_call = history['output_tokens'] / calls if calls else 300.0
+        latency_per_call = history['latency'] / calls if calls else 30.0
+        server_per_call = latency_per_call
+        if calls and history.get('server_seconds'):
+            server_per_call = history['server_seconds'] / calls
+
+        concurrency = self.limiter.maximum
+        plan['prompt_tokens'] = int(prompt_chars / chars_per_token)
+        plan['output_tokens'] = int(generation_calls * output_per_call)
+        plan['concurrency'] = concurrency
+        plan['gpu_seconds'] = round(plan['llm_calls'] * server_per_call, 1)
+        plan['wall_seconds'] = round(plan['llm_calls'] * latency_per_call / concurrency, 1)
+        manifest = self.load_manifest()
+        plan['pending_from_last_run'] = len(manifest.get('pending', []))
+        plan['last_run_complete'] = manifest.get('complete', True)
+        return plan
+
+    def print_plan(self, plan: Dict[str, Any]):
+        """Wypisuje plan generowania w czytelnej formie"""
+        print("📋 Plan generowania bloga:")
+        print(f"  Commity: {plan['commits']}, posty: {plan['jobs']}")
+        print(f"  Gotowe w cache: {plan['cached']}, bez LLM: {plan['without_llm']}, "
+              f"do wygenerowania: {plan['llm_jobs']}")
+        print(f"  Wywołania LLM: {plan['llm_calls']} "
+              f"(klasyfikacja: {plan['classification_calls']}, "
+              f"embeddingi: {plan['embedding_calls']})")
+        print(f"  Tokeny: ~{plan['prompt_tokens']} wejściowych, "
+              f"~{plan['output_tokens']} wyjściowych")
+        print(f"  Czas GPU: ~{plan['gpu_seconds'] / 60:.1f} min, "
+              f"czas całkowity: ~{plan['wall_seconds'] / 60:.1f} min "
+              f"(współbieżność {plan['concurrency']})")
+        if not plan['history_calls']:
+            print("  ⚠️ Brak historii wywołań - szacunki na podstawie wartości domyślnych")
+        if not plan['last_run_complete']:
+            print(f"  Poprzedni przebieg przerwany przed przejrzeniem całej historii "
+                  f"(posty w toku: {plan['pending_from_last_run']})")
+        elif plan['pending_from_last_run']:
+            print(f"  Niedokończone posty z poprzedniego przebiegu: "
+                  f"{plan['pending_from_last_run']}")
+
     def generate_blog(self):
-        """Główna funkcja generująca blog"""
+        """Główna funkcja generująca blog
+
+        Etapy działają strumieniowo: partie commitów -> grupowanie -> generowanie
+        -> zapis HTML. Pełna treść posta trafia od razu na dysk, w pamięci zostają
+        tylko skróty potrzebne stronie głównej.
+        """
         print("🚀 Rozpoczynam generowanie bloga...")
 
         # Sprawdź czy jesteśmy w repozytorium Git
@@ -438,72 +2406,39 @@ Zwróć tylko tytuł bez dodatkowych komentarzy.
             print("❌ Ollama nie jest dostępna! Upewnij się, że działa na localhost:11434")
             return
 
-        # Pobierz commity
-        commits = self.get_git_commits(self.config.get('commit_limit', 50))
-        if not commits:
+        self.preload_models()
+
+        # Pobierz commity (partiami)
+        chunks = self.iter_commit_chunks(self.config.get('commit_limit', 50))
+        first_chunk = next(chunks, None)
+        if not first_chunk:
             print("❌ Nie znaleziono żadnych commitów!")
             return
 
-        print(f"📝 Znaleziono {len(commits)} commitów")
+        print(f"📝 Znaleziono {len(first_chunk)} commitów w pierwszej partii")
 
         # Utwórz katalog wyjściowy
         self.output_dir.mkdir(exist_ok=True)
-        
-        # Sprawdź metodę grupowania
-        grouping_method = self.config.get('post_grouping', {}).get('method', 'commit')
-        posts = []
-        
-        if grouping_method == 'day':
-            # Grupuj commity według dni
-            commit_groups = self.group_commits_by_day(commits)
-            print(f"📅 Grupowanie według dni: {len(commit_groups)} grup")
-            
-            for i, group in enumerate(commit_groups):
-                print(f"⏳ Generuję post {i + 1}/{len(commit_groups)}: Dzień {group['date']} ({group['count']} commitów)...")
-                post = self.generate_blog_post_from_group(group)
-                posts.append(post)
-                
-                # Zapisz post jako HTML
-                post_html = self.create_html_post(post)
-                post_file = self.output_dir / f"post_{i + 1}.html"
-                with open(post_file, 'w', encoding='utf-8') as f:
-                    f.write(post_html)
-                    
-        elif grouping_method == 'count':
-            # Grupuj commity po określonej liczbie
-            commits_per_post = self.config.get('post_grouping', {}).get('commits_per_post', 3)
-            commit_groups = self.group_commits_by_count(commits, commits_per_post)
-            print(f"🔢 Grupowanie po {commits_per_post} commitów: {len(commit_groups)} grup")
-            
-            for i, group in enumerate(commit_groups):
-                print(f"⏳ Generuję post {i + 1}/{len(commit_groups)}: Grupa {i+1} ({group['count']} commitów)...")
-                post = self.generate_blog_post_from_group(group)
-                posts.append(post)
-                
-                # Zapisz post jako HTML
-                post_html = self.create_html_post(post)
-                post_file = self.output_dir / f"post_{i + 1}.html"
-                with open(post_file, 'w', encoding='utf-8') as f:
-                    f.write(post_html)
-        else:
-            # Standardowe generowanie - jeden commit, jeden post
-            for i, commit in enumerate(commits):
-                print(f"⏳ Generuję post {i + 1}/{len(commits)}: {commit['subject'][:50]}...")
-                post = self.generate_blog_post(commit)
-                posts.append(post)
 
-                # Zapisz post jako HTML
-                post_html = self.create_html_post(post)
-                post_file = self.output_dir / f"post_{i + 1}.html"
-                with open(post_file, 'w', encoding='utf-8') as f:
-                    f.write(post_html)
+        def all_chunks():
+            yield first_chunk
+            yield from chunks
 
-        # Utwórz stronę główną
-        print("📄 Tworzę stronę główną...")
-        index_html = self.create_index_page(posts)
+        pending = {}
+        stream = {'done': False}
+
+        def all_jobs():
+            yield from self.iter_jobs(all_chunks())
+            stream['done'] = True
+
+        self.progress.start()
+        try:
+            results = self.run_jobs(all_jobs(), pending, heartbeat=1.0)
+            self.write_posts(self.with_titles(results), pending, stream)
+        finally:
+            self.progress.finish()
+        self.save_stats()
         index_file = self.output_dir / "index.html"
-        with open(index_file, 'w', encoding='utf-8') as f:
-            f.write(index_html)
 
         print(f"✅ Blog wygenerowany! Otwórz {index_file} w przeglądarce.")
         print(f"📁 Pliki znajdują się w katalogu: {self.output_dir}")
@@ -549,6 +2484,31 @@ def main():
     parser.add_argument('--init', action='store_true', help='Utwórz domyślny plik konfiguracyjny')
     parser.add_argument('--config', default='git2blog.yaml', help='Ścieżka do pliku konfiguracyjnego')
     parser.add_argument('--menu', action='store_true', help='Uruchom kreator konfiguracji (interaktywny)')
+    parser.add_argument('--since', help='Tylko commity od daty (git log --since)')
+    parser.add_argument('--until', help='Tylko commity do daty (git log --until)')
+    parser.add_argument('--author', action='append', help='Tylko commity autora (można powtarzać)')
+    parser.add_argument('--range', dest='revision_range', action='append',
+                        help='Zakres rewizji, np. v1.0..HEAD (można powtarzać)')
+    parser.add_argument('--path', action='append',
+                        help='Tylko commity zmieniające ścieżkę (można powtarzać)')
+    parser.add_argument('--first-parent', action='store_true',
+                        help='Tylko pierwszy rodzic (git log --first-parent)')
+    parser.add_argument('--deploy', nargs='?', const='', metavar='CEL',
+                        help='Wdróż zmienione pliki do katalogu lub s3://bucket/prefix '
+                             '(domyślnie deploy.target)')
+    parser.add_argument('--plan', nargs='?', const='text', choices=['text', 'json'],
+                        help='Oszacuj wywołania LLM, tokeny i czas bez generowania (text/json)')
+    parser.add_argument('--queue', default='git2blog-queue.db',
+                        help='Ścieżka do bazy SQLite kolejki zadań')
+    parser.add_argument('--enqueue', action='store_true',
+                        help='Dodaj zadania generowania do kolejki')
+    parser.add_argument('--worker', action='store_true', help='Generuj posty z kolejki zadań')
+    parser.add_argument('--assemble', action='store_true', help='Złóż blog z wyników w kolejce')
+    parser.add_argument('--metrics-port', type=int,
+                        help='Udostępnij metryki Prometheus na porcie (/metrics)')
+    parser.add_argument('--otlp-endpoint',
+                        help='Wysyłaj spany OpenTelemetry (OTLP/HTTP) na adres, '
+                             'np. http://localhost:4318')
 
     args = parser.parse_args()
 
@@ -562,7 +2522,43 @@ def main():
         return
 
     git2blog = Git2Blog(args.config)
-    git2blog.generate_blog()
+
+    # Opcje wyboru commitów z linii komend nadpisują konfigurację
+    selection = git2blog.config.setdefault('commit_selection', {})
+    for key, value in (('since', args.since), ('until', args.until), ('authors', args.author),
+                       ('revision_range', args.revision_range), ('paths', args.path)):
+        if value:
+            selection[key] = value
+    if args.first_parent:
+        selection['first_parent'] = True
+
+    # Opcje telemetrii z linii komend nadpisują sekcję telemetry
+    if args.metrics_port is not None:
+        git2blog.progress.metrics_port = args.metrics_port
+    if args.otlp_endpoint:
+        git2blog.progress.otlp_endpoint = args.otlp_endpoint.rstrip('/')
+
+    if args.plan:
+        # Komunikaty etapów na stderr, żeby wynik JSON był czytelny dla harmonogramu
+        with contextlib.redirect_stdout(sys.stderr if args.plan == 'json' else sys.stdout):
+            plan = git2blog.plan_build()
+        if args.plan == 'json':
+            print(json.dumps(plan, indent=2))
+        else:
+            git2blog.print_plan(plan)
+        return
+
+    if args.enqueue:
+        git2blog.enqueue_jobs(args.queue)
+    elif args.worker:
+        git2blog.run_worker(args.queue)
+    elif args.assemble:
+        git2blog.assemble_blog(args.queue)
+    else:
+        git2blog.generate_blog()
+
+    if args.deploy is not None and not (args.enqueue or args.worker):
+        git2blog.deploy_site(args.deploy)
 
 
 if __name__ == "__main__":
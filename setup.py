@@ -40,6 +40,10 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=requirements,
+    extras_require={
+        "semantic": ["numpy>=1.21"],
+        "s3": ["boto3>=1.26"],
+    },
     entry_points={
         "console_scripts": [
             "git2blog=git2blog:main",
@@ -30,6 +30,15 @@ def test_help():
     assert '--menu' in result.stdout
 
 
+def test_help_lists_options():
+    result = run_cli(['--help'])
+    assert result.returncode == 0
+    for option in ('--queue', '--enqueue', '--worker', '--assemble',
+                   '--since', '--until', '--author', '--range', '--path', '--first-parent',
+                   '--deploy', '--plan', '--metrics-port', '--otlp-endpoint'):
+        assert option in result.stdout
+
+
 def test_init_creates_config(tmp_path):
     os.chdir(tmp_path)
     result = run_cli(['--init'])
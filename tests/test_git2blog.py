@@ -9,6 +9,7 @@ import shutil
 import os
 import sys
 import json
+import time
 from pathlib import Path
 from unittest.mock import patch, Mock, MagicMock
 
@@ -16,7 +17,12 @@ from unittest.mock import patch, Mock, MagicMock
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from git2blog import Git2Blog
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from git2blog import Git2Blog, AdaptiveConcurrencyLimiter, WorkQueue, ProgressReporter
 except ImportError:
     # Fallback jeśli moduł nie jest dostępny
     Git2Blog = None
@@ -95,7 +101,8 @@ class TestGit2Blog(unittest.TestCase):
         # Mock odpowiedzi subprocess
         mock_result = Mock()
         mock_result.returncode = 0
-        mock_result.stdout = "abc123|Jan Kowalski|jan@example.com|2025-01-15|Test commit|Test body\n"
+        mock_result.stdout = ("\x1eabc123\x00Jan Kowalski\x00jan@example.com\x002025-01-15"
+                              "\x00Test commit\x00Test body\n")
         mock_run.return_value = mock_result
         
         git2blog = Git2Blog()
@@ -222,13 +229,16 @@ class TestGit2BlogIntegration(unittest.TestCase):
         # Mock commitów Git
         mock_git_result = Mock()
         mock_git_result.returncode = 0
-        mock_git_result.stdout = "abc123|Jan Kowalski|jan@example.com|2025-01-15|Test commit|Test body"
+        mock_git_result.stdout = ("\x1eabc123\x00Jan Kowalski\x00jan@example.com\x002025-01-15"
+                                  "\x00Test commit\x00Test body")
         mock_run.return_value = mock_git_result
         
         # Mock odpowiedzi Ollama
         mock_ollama_response = Mock()
         mock_ollama_response.status_code = 200
-        mock_ollama_response.json.return_value = {'response': 'Wygenerowany post blogowy'}
+        mock_ollama_response.json.return_value = {
+            'message': {'content': 'Wygenerowany post blogowy'}
+        }
         mock_post.return_value = mock_ollama_response
         
         # Utwórz konfigurację
@@ -251,7 +261,14 @@ class TestGit2BlogIntegration(unittest.TestCase):
         # Sprawdź czy pliki zostały utworzone
         self.assertTrue(os.path.exists('blog'))
         self.assertTrue(os.path.exists('blog/index.html'))
-        self.assertTrue(os.path.exists('blog/post_1.html'))
+        self.assertTrue(list(Path('blog').glob('post_*.html')))
+
+        # Ponowne uruchomienie korzysta z gotowych postów bez wywołań LLM
+        mock_post.reset_mock()
+        with patch('yaml.safe_load', return_value=config):
+            with patch('os.path.exists', return_value=True):
+                Git2Blog('test.yaml').generate_blog()
+        mock_post.assert_not_called()
 
 class TestConfigValidation(unittest.TestCase):
     """Testy walidacji konfiguracji"""
@@ -298,6 +315,1158 @@ class TestUtilityFunctions(unittest.TestCase):
         self.assertEqual(len(loaded_commits), 1)
         self.assertEqual(loaded_commits[0]['author'], 'Jan Kowalski')
 
+class TestTrivialCommits(unittest.TestCase):
+    """Testy klasyfikacji trywialnych commitów"""
+
+    def setUp(self):
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+        self.git2blog.config = {'trivial_commits': {'enabled': True, 'action': 'digest'}}
+
+    def make_commit(self, hash, subject, files=None):
+        commit = {'hash': hash, 'author': 'Jan Kowalski', 'email': 'jan@example.com',
+                  'date': '2025-01-15 10:30:00', 'subject': subject, 'body': ''}
+        if files is not None:
+            commit['files'] = files
+        return commit
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_classify_commit(self):
+        """Test rozpoznawania trywialnych commitów"""
+        classify = self.git2blog.classify_commit
+        self.assertEqual(classify(self.make_commit('a1', 'Fix typo in README')), 'subject')
+        self.assertEqual(classify(self.make_commit('a2', 'Bump version to 1.0.9')), 'subject')
+        self.assertEqual(classify(self.make_commit('a3', 'style: apply black')), 'type')
+        self.assertEqual(self.git2blog.classify_commit(
+            self.make_commit('a4', 'Update deps', files=['poetry.lock', 'web/yarn.lock'])), 'files')
+        self.assertIsNone(self.git2blog.classify_commit(
+            self.make_commit('a5', 'Dodaj eksport RSS', files=['git2blog.py', 'poetry.lock'])))
+        # version.py może zawierać logikę - wzorzec tylko opt-in
+        self.assertIsNone(self.git2blog.classify_commit(
+            self.make_commit('a6', 'Wczytaj wersję z pakietu', files=['version.py'])))
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_subject_patterns_match_whole_subject(self):
+        """Test, że prawdziwe zmiany o podobnych tytułach nie są uznawane za trywialne"""
+        classify = self.git2blog.classify_commit
+        for subject in ('Format', 'Reformatting code', 'chore(release): 2.1.0',
+                        'Bump version to 1.0.9', 'Fix typo in README.md', 'fix lint errors',
+                        'v2.0.1', 'WIP'):
+            self.assertEqual(classify(self.make_commit('t', subject)), 'subject', subject)
+        for subject in ('Format dates in RSS feed', 'Release 2.0 with plugin system',
+                        'Fix typos in parser that broke CI', 'Lint rules for the new API',
+                        'Bump lodash from 4.17.20 to 4.17.21 to fix CVE',
+                        'Whitespace-aware diff view'):
+            self.assertIsNone(classify(self.make_commit('t', subject)), subject)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    @patch('subprocess.run')
+    def test_filter_and_digest_jobs(self, mock_run):
+        """Test podziału commitów i budowy zadań zbiorczych"""
+        mock_run.return_value = Mock(returncode=0,
+                                     stdout="\x00b1\n\npoetry.lock\n\x00b2\n\ngit2blog.py\n")
+        commits = [self.make_commit('b1', 'Update lockfile'),
+                   self.make_commit('b2', 'Dodaj eksport RSS')]
+
+        regular, trivial = self.git2blog.filter_trivial_commits(commits)
+        self.assertEqual([c['hash'] for c in regular], ['b2'])
+        self.assertEqual([c['hash'] for c in trivial], ['b1'])
+
+        with patch('builtins.print'):
+            jobs = self.git2blog.build_jobs(regular, trivial)
+        self.assertEqual([job['kind'] for job in jobs], ['commit', 'digest'])
+        post = self.git2blog.generate_post_for_job(jobs[1])
+        self.assertIn('Update lockfile', post['content'])
+        self.assertEqual(post['commit_hash'], 'b1')
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_disabled_by_default(self):
+        """Test braku filtrowania przy wyłączonej klasyfikacji"""
+        self.git2blog.config = {}
+        commits = [self.make_commit('c1', 'Fix typo')]
+        self.assertEqual(self.git2blog.filter_trivial_commits(commits), (commits, []))
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    """Testy adaptacyjnego limitu współbieżności"""
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_additive_increase(self):
+        """Test wzrostu limitu przy szybkich odpowiedziach"""
+        limiter = AdaptiveConcurrencyLimiter(initial=1, maximum=4, target_latency=10)
+        for _ in range(10):
+            limiter.release(limiter.acquire())
+        self.assertEqual(limiter.current_limit, 4)
+        self.assertEqual(limiter.snapshot(), {'limit': 4, 'in_flight': 0, 'waiting': 0})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_multiplicative_decrease_once_per_window(self):
+        """Test jednorazowej redukcji limitu dla okna przeciążonych zapytań"""
+        limiter = AdaptiveConcurrencyLimiter(initial=4, maximum=8, target_latency=10)
+        started = [limiter.acquire() for _ in range(4)]
+        for started_at in started:
+            limiter.release(started_at, overloaded=True)
+        self.assertEqual(limiter.current_limit, 2)
+
+        limiter.release(limiter.acquire(), overloaded=True)
+        self.assertEqual(limiter.current_limit, 1)
+
+    @patch('time.sleep')
+    @patch('requests.post')
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_call_ollama_retries_on_overload(self, mock_post, mock_sleep):
+        """Test ponowienia zapytania po HTTP 503"""
+        busy = Mock(status_code=503)
+        ok = Mock(status_code=200)
+        ok.json.return_value = {'response': 'Treść'}
+        mock_post.side_effect = [busy, ok]
+
+        with patch('os.path.exists', return_value=False):
+            git2blog = Git2Blog('nonexistent.yaml')
+        git2blog.limiter.limit = 2.0
+
+        self.assertEqual(git2blog.call_ollama("Test prompt"), 'Treść')
+        self.assertEqual(mock_post.call_count, 2)
+        mock_sleep.assert_called_once_with(1)
+
+class TestProgressivePublishing(unittest.TestCase):
+    """Testy publikowania postów w trakcie generowania"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+        self.git2blog.output_dir = Path(self.temp_dir) / 'blog'
+        self.git2blog.state_dir = self.git2blog.output_dir / '.git2blog'
+        self.git2blog.output_dir.mkdir()
+        self.jobs = [
+            {'kind': 'commit', 'key': 'k1', 'number': 1, 'file': 'post_1.html', 'label': 'Nowszy'},
+            {'kind': 'commit', 'key': 'k2', 'number': 2, 'file': 'post_2.html', 'label': 'Starszy'},
+        ]
+        self.post = {'title': 'Nowszy post', 'content': 'Treść', 'date': '2025-01-15 10:30:00',
+                     'author': 'Jan Kowalski', 'commit_hash': 'abc123'}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_publish_progress_records_pending(self):
+        """Test zapisu strony głównej i listy oczekujących postów"""
+        summary = self.git2blog.post_summary(self.jobs[0], self.post)
+        self.assertNotIn('content', summary)
+        self.git2blog.publish_progress([summary], [self.jobs[1]])
+
+        index = (self.git2blog.output_dir / 'index.html').read_text(encoding='utf-8')
+        self.assertIn('Nowszy post', index)
+        self.assertIn('1 postów w toku', index)
+
+        manifest = self.git2blog.load_manifest()
+        self.assertEqual(list(manifest['posts']), ['k1'])
+        self.assertEqual(manifest['pending'],
+                         [{'key': 'k2', 'file': 'post_2.html', 'label': 'Starszy'}])
+        self.assertTrue(manifest['complete'])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_write_posts_publishes_only_new_posts(self):
+        """Test publikowania partiami tylko nowo wygenerowanych postów"""
+        self.git2blog.config = {'publish': {'batch_size': 2, 'min_interval': 0}}
+        results = []
+        for i in range(10):
+            job = {'kind': 'commit', 'key': f'k{i}', 'number': i + 1, 'file': f'post_k{i}.html',
+                   'label': f'Post {i}', 'date': self.post['date'],
+                   'commit': {'hash': 'abc123', 'author': 'Jan'}}
+            if i < 6:
+                job['cached'] = True
+            results.append((job, dict(self.post)))
+
+        with patch.object(self.git2blog, 'publish_progress') as mock_publish, \
+                patch('builtins.print'):
+            self.git2blog.write_posts(results, {})
+
+        # Dwie partie po dwa nowe posty i publikacja końcowa
+        self.assertEqual(mock_publish.call_count, 3)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_write_posts_throttles_publishing(self):
+        """Test ograniczenia częstotliwości przepisywania strony głównej"""
+        self.git2blog.config = {'publish': {'batch_size': 1, 'min_interval': 3600}}
+        results = [({'kind': 'commit', 'key': f'k{i}', 'number': i + 1, 'file': f'post_k{i}.html',
+                     'label': f'Post {i}', 'date': self.post['date'],
+                     'commit': {'hash': 'abc123', 'author': 'Jan'}},
+                    dict(self.post)) for i in range(5)]
+
+        with patch.object(self.git2blog, 'publish_progress') as mock_publish, \
+                patch('builtins.print'):
+            self.git2blog.write_posts(results, {})
+
+        # Pierwsza partia od razu, kolejne dopiero po min_interval, na końcu pełny indeks
+        self.assertEqual(mock_publish.call_count, 2)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_publish_progress_marks_unfinished_stream(self):
+        """Test oznaczenia, że liczba oczekujących dotyczy tylko zadań w toku"""
+        summary = self.git2blog.post_summary(self.jobs[0], self.post)
+        self.git2blog.publish_progress([summary], [self.jobs[1]], complete=False)
+
+        index = (self.git2blog.output_dir / 'index.html').read_text(encoding='utf-8')
+        self.assertIn('1 postów w toku, kolejne commity czekają na przetworzenie', index)
+        self.assertFalse(self.git2blog.load_manifest()['complete'])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_store_post_roundtrip(self):
+        """Test zapisu i odczytu gotowego posta"""
+        self.git2blog.store_post('k1', self.post)
+        self.assertEqual(self.git2blog.load_stored_post('k1'), self.post)
+        self.assertIsNone(self.git2blog.load_stored_post('k2'))
+
+class TestSemanticGrouping(unittest.TestCase):
+    """Testy grupowania semantycznego"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+        self.git2blog.config = {'post_grouping': {'method': 'semantic', 'window_days': 7}}
+        self.git2blog.state_dir = Path(self.temp_dir) / '.git2blog'
+        self.commits = [
+            {'hash': h, 'author': 'A', 'email': '', 'date': f'{day} 10:00:00',
+             'subject': subject, 'body': ''}
+            for h, day, subject in (('a1', '2025-01-15', 'Login form'),
+                                    ('a2', '2025-01-14', 'Dark theme'),
+                                    ('a3', '2025-01-13', 'Login validation'),
+                                    ('a4', '2024-10-01', 'Login tests'))
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def fake_embed(self, url, json=None, timeout=None):
+        response = Mock(status_code=200)
+        response.json.return_value = {
+            'embeddings': [[1.0, 0.1] if 'Login' in text else [0.0, 1.0] for text in json['input']]
+        }
+        return response
+
+    @unittest.skipIf(Git2Blog is None or numpy is None, "Wymagany git2blog i numpy")
+    @patch('requests.post')
+    def test_groups_similar_commits_within_window(self, mock_post):
+        """Test łączenia podobnych commitów z okna czasowego"""
+        mock_post.side_effect = self.fake_embed
+        groups = self.git2blog.group_commits_by_similarity(self.commits)
+
+        self.assertEqual([[c['hash'] for c in g['commits']] for g in groups],
+                         [['a1', 'a3'], ['a2'], ['a4']])
+        self.assertEqual(groups[0]['date'], '2025-01-15')
+
+    @unittest.skipIf(Git2Blog is None or numpy is None, "Wymagany git2blog i numpy")
+    @patch('requests.post')
+    def test_embeddings_are_cached(self, mock_post):
+        """Test cache embeddingów per hash commita"""
+        mock_post.side_effect = self.fake_embed
+        self.git2blog.group_commits_by_similarity(self.commits)
+        self.assertEqual(mock_post.call_count, 1)
+
+        self.git2blog.group_commits_by_similarity(self.commits)
+        self.assertEqual(mock_post.call_count, 1)
+
+    @unittest.skipIf(Git2Blog is None or numpy is None, "Wymagany git2blog i numpy")
+    @patch('requests.post')
+    def test_embedding_cache_reads_current_window(self, mock_post):
+        """Test odczytu z cache tylko wektorów commitów z bieżącego okna"""
+        mock_post.side_effect = self.fake_embed
+        self.git2blog.group_commits_by_similarity(self.commits)
+
+        with patch('numpy.frombuffer', wraps=numpy.frombuffer) as mock_frombuffer:
+            self.git2blog.group_commits_by_similarity(self.commits[:2])
+        self.assertEqual(mock_frombuffer.call_count, 2)
+        self.assertEqual(mock_post.call_count, 1)
+
+    @unittest.skipIf(Git2Blog is None or numpy is None, "Wymagany git2blog i numpy")
+    @patch('requests.post')
+    def test_corrupted_embedding_cache_is_replaced(self, mock_post):
+        """Test traktowania uszkodzonego cache embeddingów jak pustego"""
+        mock_post.side_effect = self.fake_embed
+        self.git2blog.state_dir.mkdir(parents=True)
+        cache_file = self.git2blog.state_dir / 'embeddings-nomic-embed-text.sqlite'
+        cache_file.write_bytes(b'to nie jest baza danych' * 100)
+
+        with patch('builtins.print'):
+            groups = self.git2blog.group_commits_by_similarity(self.commits)
+            self.git2blog.group_commits_by_similarity(self.commits)
+
+        self.assertEqual(len(groups), 3)
+        self.assertEqual(mock_post.call_count, 1)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    @patch('requests.post')
+    def test_embeddings_use_limiter_and_retry_overload(self, mock_post):
+        """Test embeddingów przez limiter z ponowieniem po 503"""
+        mock_post.side_effect = [Mock(status_code=503),
+                                 self.fake_embed('', json={'input': ['Login']})]
+        self.git2blog.limiter = AdaptiveConcurrencyLimiter(initial=4, maximum=4, target_latency=10)
+
+        with patch('time.sleep') as mock_sleep, patch('builtins.print'):
+            vectors = self.git2blog.call_ollama_embeddings(['Login'])
+
+        self.assertEqual(vectors, [[1.0, 0.1]])
+        self.assertEqual(mock_post.call_count, 2)
+        mock_sleep.assert_called_once_with(1)
+        self.assertEqual(self.git2blog.limiter.current_limit, 2)
+        self.assertEqual(self.git2blog.limiter.snapshot()['in_flight'], 0)
+
+class TestStreamingPipeline(unittest.TestCase):
+    """Testy strumieniowych etapów generowania"""
+
+    def setUp(self):
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+
+    def make_commits(self, days):
+        return [{'hash': f'h{i}', 'author': 'A', 'email': '', 'date': f'2025-01-{day:02d} 10:00:00',
+                 'subject': f'Commit {i}', 'body': ''} for i, day in enumerate(days)]
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_iter_commit_chunks_pages_through_history(self):
+        """Test pobierania historii partiami"""
+        self.git2blog.config = {'commit_chunk_size': 2}
+        commits = self.make_commits([5, 4, 3])
+        with patch.object(self.git2blog, 'resolve_revisions', return_value=['f00d']), \
+                patch.object(self.git2blog, 'get_git_commits',
+                             side_effect=lambda limit, skip=0, revisions=None:
+                             commits[skip:skip + limit]) as mock_get:
+            chunks = list(self.git2blog.iter_commit_chunks(10))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        # Kolejne partie liczone od tego samego wierzchołka
+        self.assertEqual(mock_get.call_args_list[1][1], {'skip': 2, 'revisions': ['f00d']})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    @patch('subprocess.run')
+    def test_get_git_commits_body_with_table(self, mock_run):
+        """Test treści commita z tabelą markdown (znaki '|' i nowe linie)"""
+        body = "| case | before | after |\n| --- | --- | --- |\n| a | 1 | 2 |"
+        mock_run.return_value = Mock(returncode=0, stdout=(
+            f"\x1eabc\x00A\x00a@x\x002025-01-02\x00Szybszy parser\x00{body}\n"
+            "\x1edef\x00B\x00b@x\x002025-01-01\x00Poprawka\x00"))
+        self.git2blog.config = {}
+
+        commits = self.git2blog.get_git_commits(limit=5)
+
+        self.assertEqual([commit['hash'] for commit in commits], ['abc', 'def'])
+        self.assertEqual(commits[0]['body'], body)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    @patch('subprocess.run')
+    def test_resolved_revisions_replace_range(self, mock_run):
+        """Test stronicowania od raz ustalonych hashy zamiast ruchomego revision_range"""
+        mock_run.return_value = Mock(returncode=0, stdout='')
+        self.git2blog.config = {'commit_selection': {'revision_range': 'v1.0..HEAD'}}
+
+        self.git2blog.get_git_commits(limit=5, skip=5, revisions=['f00d', '^beef'])
+
+        cmd = mock_run.call_args[0][0]
+        self.assertEqual(cmd[-2:], ['f00d', '^beef'])
+        self.assertNotIn('v1.0..HEAD', cmd)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_iter_jobs_keeps_days_together_across_chunks(self):
+        """Test przenoszenia commitów z ostatniego dnia partii do następnej"""
+        self.git2blog.config = {'post_grouping': {'method': 'day'}}
+        commits = self.make_commits([5, 4, 4, 3])
+        with patch('builtins.print'):
+            jobs = list(self.git2blog.iter_jobs([commits[:2], commits[2:]]))
+
+        self.assertEqual([job['group']['count'] for job in jobs], [1, 2, 1])
+        self.assertEqual([job['file'] for job in jobs],
+                         [f"post_{job['key'][:12]}.html" for job in jobs])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_post_files_stable_after_new_commit(self):
+        """Test niezmienionych nazw plików starszych postów po dodaniu nowego commita"""
+        commits = self.make_commits([4, 3])
+        new_commit = {'hash': 'new', 'author': 'A', 'email': '', 'date': '2025-01-05 10:00:00',
+                      'subject': 'Nowy commit', 'body': ''}
+        with patch('builtins.print'):
+            before = [job['file'] for job in self.git2blog.iter_jobs([commits])]
+            after = [job['file'] for job in self.git2blog.iter_jobs([[new_commit] + commits])]
+
+        self.assertEqual(after[1:], before)
+
+class TestWorkQueue(unittest.TestCase):
+    """Testy kolejki zadań SQLite"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.queue_path = os.path.join(self.temp_dir, 'queue.db')
+        self.jobs = [
+            {'kind': 'commit', 'key': 'k1', 'number': 1, 'file': 'post_1.html',
+             'label': 'Pierwszy'},
+            {'kind': 'commit', 'key': 'k2', 'number': 2, 'file': 'post_2.html',
+             'label': 'Drugi'},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_claim_lease_and_complete(self):
+        """Test dzierżawy, przejęcia po wygaśnięciu i zapisu wyniku"""
+        queue = WorkQueue(self.queue_path, lease_seconds=60)
+        self.assertEqual(queue.enqueue(self.jobs, 'cfg'), 2)
+
+        self.assertIsNone(queue.claim('w1', 'inny-cfg'))
+        self.assertEqual(queue.claim('w1', 'cfg')['key'], 'k1')
+        self.assertEqual(queue.claim('w2', 'cfg')['key'], 'k2')
+        self.assertIsNone(queue.claim('w3', 'cfg'))
+
+        # Wygasła dzierżawa może zostać przejęta przez innego workera
+        with patch('time.time', return_value=time.time() + 120):
+            self.assertEqual(queue.claim('w3', 'cfg')['key'], 'k1')
+        self.assertFalse(queue.complete('k1', 'w1', {'title': 'Spóźniony'}))
+        self.assertTrue(queue.complete('k1', 'w3', {'title': 'Gotowy'}))
+
+        results = list(queue.results())
+        self.assertEqual(results[0][1], {'title': 'Gotowy'})
+        self.assertIsNone(results[1][1])
+        self.assertEqual(queue.counts(), {'done': 1, 'leased': 1})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_reenqueue_keeps_done_jobs(self):
+        """Test ponownego dodania zadań - gotowe zostają, zmiana konfiguracji je resetuje"""
+        queue = WorkQueue(self.queue_path)
+        queue.enqueue(self.jobs, 'cfg')
+        queue.claim('w1', 'cfg')
+        queue.complete('k1', 'w1', {'title': 'Gotowy'})
+
+        queue.enqueue(self.jobs, 'cfg')
+        self.assertEqual(queue.counts(), {'done': 1, 'pending': 1})
+        queue.enqueue(self.jobs[:1], 'nowy-cfg')
+        self.assertEqual(queue.counts(), {'pending': 1})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_expired_lease_respects_max_attempts(self):
+        """Test oznaczenia jako nieudane zadania, którego dzierżawy wygasały max_attempts razy"""
+        queue = WorkQueue(self.queue_path, lease_seconds=60, max_attempts=2)
+        queue.enqueue(self.jobs[:1], 'cfg')
+        now = time.time()
+        for attempt in range(2):
+            with patch('time.time', return_value=now + attempt * 120):
+                self.assertEqual(queue.claim(f'w{attempt}', 'cfg')['key'], 'k1')
+
+        with patch('time.time', return_value=now + 360):
+            self.assertIsNone(queue.claim('w3', 'cfg'))
+        self.assertEqual(queue.counts(), {'failed': 1})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_reenqueue_resets_failed_jobs(self):
+        """Test powrotu nieudanych zadań do kolejki z wyzerowaną liczbą prób"""
+        queue = WorkQueue(self.queue_path, max_attempts=1)
+        queue.enqueue(self.jobs[:1], 'cfg')
+        queue.claim('w1', 'cfg')
+        queue.release('k1', 'w1')
+        self.assertEqual(queue.counts(), {'failed': 1})
+
+        queue.enqueue(self.jobs[:1], 'cfg')
+        self.assertEqual(queue.counts(), {'pending': 1})
+        self.assertEqual(queue.claim('w2', 'cfg')['key'], 'k1')
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    @patch('requests.post')
+    def test_enqueue_worker_assemble(self, mock_post):
+        """Test pełnego przepływu koordynator -> worker -> złożenie bloga"""
+        mock_post.return_value = Mock(status_code=200)
+        mock_post.return_value.json.return_value = {'message': {'content': 'Treść z workera'}}
+        commits = [{'hash': 'abc123', 'author': 'Jan Kowalski', 'email': '',
+                    'date': '2025-01-15 10:30:00', 'subject': 'Dodaj funkcję X', 'body': ''}]
+
+        with patch('os.path.exists', return_value=False):
+            git2blog = Git2Blog('nonexistent.yaml')
+        git2blog.config = {'queue': {'poll_interval': 0.01}}
+        git2blog.output_dir = Path(self.temp_dir) / 'blog'
+        git2blog.state_dir = git2blog.output_dir / '.git2blog'
+
+        with patch('builtins.print'):
+            with patch('os.path.exists', return_value=True), \
+                    patch.object(git2blog, 'get_git_commits', return_value=commits):
+                git2blog.enqueue_jobs(self.queue_path)
+            git2blog.run_worker(self.queue_path)
+            git2blog.assemble_blog(self.queue_path)
+
+        messages = mock_post.call_args_list[0][1]['json']['messages']
+        self.assertIn('Dodaj funkcję X', messages[1]['content'])
+        post_file, = git2blog.output_dir.glob('post_*.html')
+        self.assertIn('Treść z workera', post_file.read_text(encoding='utf-8'))
+        index = (git2blog.output_dir / 'index.html').read_text(encoding='utf-8')
+        self.assertIn('Treść z workera', index)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_enqueue_reads_jobs_outside_transaction(self):
+        """Test odczytu strumienia zadań bez blokady zapisu bazy"""
+        queue = WorkQueue(self.queue_path)
+
+        def jobs():
+            for job in self.jobs:
+                # Inny proces może w tym czasie pisać do kolejki
+                with queue.connect() as db:
+                    db.execute("BEGIN IMMEDIATE")
+                    db.execute("COMMIT")
+                yield job
+
+        self.assertEqual(queue.enqueue(jobs(), 'cfg', batch_size=1), 2)
+        self.assertEqual(queue.counts(), {'pending': 2})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    @patch('requests.post')
+    def test_worker_retries_locked_queue(self, mock_post):
+        """Test ponowienia operacji na zablokowanej kolejce zamiast zakończenia workera"""
+        import sqlite3
+        with patch('os.path.exists', return_value=False):
+            git2blog = Git2Blog('nonexistent.yaml')
+        git2blog.config = {'queue': {'poll_interval': 0.01}}
+        queue = WorkQueue(self.queue_path)
+        queue.enqueue([], 'cfg')
+        claim = WorkQueue.claim
+        calls = []
+
+        def flaky_claim(self, worker, config_hash):
+            calls.append(worker)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError('database is locked')
+            return claim(self, worker, config_hash)
+
+        with patch.object(WorkQueue, 'claim', flaky_claim), patch('builtins.print'):
+            git2blog.run_worker(self.queue_path)
+
+        self.assertGreaterEqual(len(calls), 2)
+
+class TestCommitSelection(unittest.TestCase):
+    """Testy wyboru commitów przekazywanego do git log"""
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    @patch('subprocess.run')
+    def test_selection_passed_to_git_log(self, mock_run):
+        """Test przekazania zakresu, dat, autorów i ścieżek do git log"""
+        mock_run.return_value = Mock(returncode=0, stdout='')
+        with patch('os.path.exists', return_value=False):
+            git2blog = Git2Blog('nonexistent.yaml')
+        git2blog.config = {'commit_selection': {
+            'revision_range': 'v1.0..HEAD',
+            'since': '2025-01-01',
+            'until': '2025-02-01',
+            'authors': ['Jan', 'Anna'],
+            'paths': ['services/api'],
+            'first_parent': True
+        }}
+
+        git2blog.get_git_commits(limit=5)
+
+        cmd = mock_run.call_args[0][0]
+        self.assertEqual(cmd[-8:], ['--since=2025-01-01', '--until=2025-02-01',
+                                    '--author=Jan', '--author=Anna', '--first-parent',
+                                    'v1.0..HEAD', '--', 'services/api'])
+        self.assertNotIn('--no-merges', cmd)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    @patch('subprocess.run')
+    def test_merges_skipped_without_first_parent(self, mock_run):
+        """Test pomijania merge'y poza trybem --first-parent"""
+        mock_run.return_value = Mock(returncode=0, stdout='')
+        with patch('os.path.exists', return_value=False):
+            git2blog = Git2Blog('nonexistent.yaml')
+        git2blog.config = {'commit_selection': {'first_parent': False}}
+
+        git2blog.get_git_commits(limit=5)
+
+        self.assertIn('--no-merges', mock_run.call_args[0][0])
+
+class TestIncrementalDeploy(unittest.TestCase):
+    """Testy przyrostowego wdrażania"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+        self.git2blog.config = {'deploy': {'invalidate_url': 'http://cdn.local/purge'}}
+        self.git2blog.output_dir = Path(self.temp_dir) / 'blog'
+        self.git2blog.state_dir = self.git2blog.output_dir / '.git2blog'
+        self.git2blog.state_dir.mkdir(parents=True)
+        (self.git2blog.output_dir / 'index.html').write_text('index', encoding='utf-8')
+        (self.git2blog.output_dir / 'post_1.html').write_text('post 1', encoding='utf-8')
+        (self.git2blog.state_dir / 'manifest.json').write_text('{}', encoding='utf-8')
+        self.target = os.path.join(self.temp_dir, 'site')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def deploy(self):
+        with patch('requests.post', return_value=Mock(status_code=200)) as mock_post, \
+                patch('builtins.print'):
+            self.git2blog.deploy_site(self.target)
+        return mock_post
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_deploys_only_changes(self):
+        """Test wysyłania tylko dodanych, zmienionych i usuniętych plików"""
+        mock_post = self.deploy()
+        self.assertEqual(sorted(os.listdir(self.target)), ['index.html', 'post_1.html'])
+        self.assertEqual(mock_post.call_args[1]['json'],
+                         {'paths': ['/index.html', '/post_1.html', '/']})
+
+        mock_post = self.deploy()
+        mock_post.assert_not_called()
+
+        (self.git2blog.output_dir / 'post_1.html').unlink()
+        (self.git2blog.output_dir / 'post_2.html').write_text('post 2', encoding='utf-8')
+        mock_post = self.deploy()
+        self.assertEqual(sorted(os.listdir(self.target)), ['index.html', 'post_2.html'])
+        self.assertEqual(mock_post.call_args[1]['json'],
+                         {'paths': ['/post_1.html', '/post_2.html']})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_s3_target(self):
+        """Test wysyłania do S3-zgodnego endpointu (np. MinIO) z prefiksem"""
+        self.git2blog.config['deploy']['endpoint_url'] = 'http://localhost:9000'
+        self.target = 's3://blog-bucket/site'
+        with patch('git2blog.boto3') as mock_boto3:
+            client = mock_boto3.client.return_value
+            self.deploy()
+
+        mock_boto3.client.assert_called_once_with('s3', endpoint_url='http://localhost:9000',
+                                                  region_name=None)
+        keys = sorted(call[0][2] for call in client.upload_file.call_args_list)
+        self.assertEqual(keys, ['site/index.html', 'site/post_1.html'])
+        self.assertEqual(client.upload_file.call_args_list[0][1]['ExtraArgs'],
+                         {'ContentType': 'text/html'})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_index_footer_is_stable(self):
+        """Test braku bieżącej daty w stopce strony głównej"""
+        posts = [{'title': 'Post', 'content': 'Treść', 'date': '2025-01-15 10:30:00',
+                  'author': 'Autor', 'commit_hash': 'abc123'}]
+        page = self.git2blog.create_index_page(posts)
+        self.assertEqual(page, self.git2blog.create_index_page(posts))
+        self.assertIn('Ostatnia aktualizacja: 2025-01-15 10:30', page)
+
+class TestBuildPlan(unittest.TestCase):
+    """Testy planowania generowania (--plan)"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+        self.git2blog.config = {'concurrency': {'max': 2}}
+        self.git2blog.limiter.maximum = 2
+        self.git2blog.output_dir = Path(self.temp_dir) / 'blog'
+        self.git2blog.state_dir = self.git2blog.output_dir / '.git2blog'
+        self.commits = [
+            {'hash': f'h{i}', 'author': 'A', 'email': '', 'date': '2025-01-15 10:00:00',
+             'subject': f'Commit {i}', 'body': ''} for i in range(3)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_plan_uses_cache_and_history(self):
+        """Test pominięcia gotowych postów i szacunków z historii wywołań"""
+        self.git2blog.stats.update({'calls': 10, 'latency': 200.0, 'server_seconds': 150.0,
+                                    'prompt_chars': 4000, 'prompt_tokens': 1000,
+                                    'output_tokens': 3000})
+        self.git2blog.save_stats()
+        cached_job = {'kind': 'commit', 'commit': self.commits[0]}
+        self.git2blog.store_post(self.git2blog.job_key(cached_job), {'title': 'Gotowy'})
+
+        with patch.object(self.git2blog, 'get_git_commits', return_value=self.commits):
+            plan = self.git2blog.plan_build()
+
+        self.assertEqual(plan['commits'], 3)
+        self.assertEqual(plan['jobs'], 3)
+        self.assertEqual(plan['cached'], 1)
+        # Dwa wywołania treści i jedna partia tytułów
+        self.assertEqual(plan['llm_calls'], 3)
+        self.assertEqual(plan['output_tokens'], 900)
+        self.assertEqual(plan['gpu_seconds'], 45.0)
+        self.assertEqual(plan['wall_seconds'], 30.0)
+
+    @unittest.skipIf(Git2Blog is None or numpy is None, "Brak numpy lub Git2Blog")
+    def test_plan_does_not_call_model(self):
+        """Test szacowania klasyfikacji i embeddingów w planie bez wywołań modelu"""
+        self.git2blog.config.update({
+            'trivial_commits': {'enabled': True, 'use_llm': True, 'action': 'drop'},
+            'post_grouping': {'method': 'semantic'}
+        })
+
+        with patch.object(self.git2blog, 'get_git_commits', return_value=self.commits), \
+                patch('requests.post') as mock_post, patch('builtins.print'):
+            plan = self.git2blog.plan_build()
+
+        mock_post.assert_not_called()
+        self.assertIsNone(self.git2blog.plan_estimates)
+        self.assertEqual(plan['classification_calls'], 3)
+        self.assertEqual(plan['embedding_calls'], 1)
+        # Grupa dzienna: treść, partia tytułów, klasyfikacja i embeddingi
+        self.assertEqual(plan['llm_calls'], 1 + 1 + 3 + 1)
+
+    @patch('requests.post')
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_call_ollama_records_stats(self, mock_post):
+        """Test zapisu czasu i tokenów wywołania Ollama"""
+        mock_post.return_value = Mock(status_code=200)
+        mock_post.return_value.json.return_value = {
+            'response': 'Tekst', 'prompt_eval_count': 3, 'eval_count': 7, 'total_duration': 2e9
+        }
+        self.git2blog.call_ollama("Prompt")
+
+        self.assertEqual(self.git2blog.stats['calls'], 1)
+        self.assertEqual(self.git2blog.stats['prompt_tokens'], 3)
+        self.assertEqual(self.git2blog.stats['output_tokens'], 7)
+        self.assertEqual(self.git2blog.stats['server_seconds'], 2.0)
+
+class TestChatPrompts(unittest.TestCase):
+    """Testy stałego promptu systemowego i /api/chat"""
+
+    @patch('requests.post')
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_posts_use_stable_system_prefix(self, mock_post):
+        """Test wspólnego prefiksu instrukcji dla różnych commitów"""
+        mock_post.return_value = Mock(status_code=200)
+        mock_post.return_value.json.return_value = {
+            'message': {'content': 'Treść'}, 'prompt_eval_count': 10, 'prompt_eval_duration': 5e7
+        }
+        with patch('os.path.exists', return_value=False):
+            git2blog = Git2Blog('nonexistent.yaml')
+
+        commits = [
+            {'hash': 'abc123', 'author': 'Jan', 'email': '', 'date': '2025-01-15',
+             'subject': 'Dodaj X', 'body': ''},
+            {'hash': 'def456', 'author': 'Anna', 'email': '', 'date': '2025-01-14',
+             'subject': 'Popraw Y', 'body': ''},
+        ]
+        posts = [git2blog.generate_blog_post(commit) for commit in commits]
+
+        self.assertEqual(posts[0]['content'], 'Treść')
+        calls = [call[1]['json'] for call in mock_post.call_args_list]
+        self.assertTrue(all(call_args[0][0].endswith('/api/chat')
+                            for call_args in mock_post.call_args_list))
+        self.assertEqual(calls[0]['messages'][0], calls[2]['messages'][0])
+        self.assertNotIn('Dodaj X', calls[0]['messages'][0]['content'])
+        self.assertIn('Dodaj X', calls[0]['messages'][1]['content'])
+        self.assertAlmostEqual(git2blog.stats['prompt_eval_seconds'], 0.2)
+
+class TestModelRouting(unittest.TestCase):
+    """Testy wyboru modelu dla zadań LLM"""
+
+    def setUp(self):
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+        self.git2blog.config = {
+            'keep_alive': '30m',
+            'models': {
+                'title': {'model': 'llama3.2:1b', 'options': {'temperature': 0.2}},
+                'classification': 'llama3.2:1b'
+            }
+        }
+        self.commit = {'hash': 'abc123', 'author': 'Jan', 'email': '', 'date': '2025-01-15',
+                       'subject': 'Dodaj X', 'body': ''}
+
+    def chat_response(self, content):
+        response = Mock(status_code=200)
+        response.json.return_value = {'message': {'content': content}}
+        return response
+
+    @patch('requests.post')
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_title_uses_small_model(self, mock_post):
+        """Test kierowania treści i tytułu do różnych modeli"""
+        mock_post.return_value = self.chat_response('Tekst')
+        self.git2blog.generate_blog_post(self.commit)
+
+        body, title = [call[1]['json'] for call in mock_post.call_args_list]
+        self.assertEqual((body['model'], body['keep_alive']), ('llama3.2', '30m'))
+        self.assertNotIn('options', body)
+        self.assertEqual((title['model'], title['options']), ('llama3.2:1b', {'temperature': 0.2}))
+
+    @patch('requests.post')
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_llm_classification_of_trivial_commits(self, mock_post):
+        """Test klasyfikacji trywialnych commitów modelem klasyfikacji"""
+        self.git2blog.config['trivial_commits'] = {'enabled': True, 'use_llm': True,
+                                                   'file_patterns': []}
+        mock_post.return_value = self.chat_response('TAK')
+
+        regular, trivial = self.git2blog.filter_trivial_commits([self.commit])
+
+        self.assertEqual((regular, trivial), ([], [self.commit]))
+        self.assertEqual(self.commit['trivial_reason'], 'llm')
+        self.assertEqual(mock_post.call_args[1]['json']['model'], 'llama3.2:1b')
+
+    @patch('requests.post')
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_preload_keeps_models_resident(self, mock_post):
+        """Test wstępnego ładowania wszystkich modeli z keep_alive"""
+        with patch('builtins.print'):
+            self.git2blog.preload_models()
+        loaded = {call[1]['json']['model']: call[1]['json']['keep_alive']
+                  for call in mock_post.call_args_list}
+        self.assertEqual(loaded, {'llama3.2': '30m', 'llama3.2:1b': '30m'})
+
+class TestBatchedTitles(unittest.TestCase):
+    """Testy zbiorczego generowania tytułów"""
+
+    def setUp(self):
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+        self.items = [
+            ({'kind': 'commit', 'commit': {'subject': f'Commit {i}', 'body': ''}},
+             {'title': None, 'content': f'Treść {i}', 'date': '2025-01-15'})
+            for i in range(3)
+        ]
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_parse_titles(self):
+        """Test odczytu listy JSON i numerowanych linii z walidacją długości"""
+        self.assertEqual(self.git2blog.parse_titles('Oto tytuły: ["A", "B"]', 2), ['A', 'B'])
+        self.assertEqual(self.git2blog.parse_titles('1. "A"\n2) B', 2), ['A', 'B'])
+        self.assertEqual(self.git2blog.parse_titles('["A", "' + 'x' * 61 + '"]', 2), ['A', None])
+        self.assertEqual(self.git2blog.parse_titles('["A"]', 2), [None, None])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_retries_only_failed_entries(self):
+        """Test ponowienia zapytania tylko dla niepoprawnych tytułów"""
+        answers = ['["Pierwszy", "", "Trzeci"]', '["Drugi"]']
+        with patch.object(self.git2blog, 'call_ollama', side_effect=answers) as mock_call:
+            self.git2blog.generate_titles(self.items)
+
+        self.assertEqual([post['title'] for _, post in self.items], ['Pierwszy', 'Drugi', 'Trzeci'])
+        self.assertIn('Liczba postów: 1', mock_call.call_args_list[1][0][0])
+        self.assertIn('Commit 1', mock_call.call_args_list[1][0][0])
+        self.assertNotIn('Commit 0', mock_call.call_args_list[1][0][0])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_with_titles_batches_posts(self):
+        """Test jednego zapytania o tytuły na partię postów"""
+        self.git2blog.title_batch_size = 2
+        titled = ({'kind': 'digest'},
+                  {'title': 'Drobne zmiany', 'content': '', 'date': '2025-01-15'})
+        answers = ['["A", "B"]', '["C"]']
+        with patch.object(self.git2blog, 'call_ollama', side_effect=answers) as mock_call:
+            results = list(self.git2blog.with_titles(iter([titled] + self.items)))
+
+        self.assertEqual(mock_call.call_count, 2)
+        self.assertEqual([post['title'] for _, post in results], ['Drobne zmiany', 'A', 'B', 'C'])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_first_batch_limited_by_publish_batch(self):
+        """Test mniejszej pierwszej partii tytułów, żeby pierwsza publikacja nie czekała"""
+        self.git2blog.config = {'publish': {'batch_size': 2}}
+        answers = ['["A", "B"]', '["C"]']
+        with patch.object(self.git2blog, 'call_ollama', side_effect=answers) as mock_call:
+            results = list(self.git2blog.with_titles(iter(self.items)))
+
+        self.assertEqual(mock_call.call_count, 2)
+        self.assertIn('Liczba postów: 2', mock_call.call_args_list[0][0][0])
+        self.assertEqual([post['title'] for _, post in results], ['A', 'B', 'C'])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_partial_batch_flushed_on_stall(self):
+        """Test opróżnienia niepełnej partii po sygnale braku nowych wyników"""
+        self.git2blog.config = {'titles': {'max_wait': 0}, 'publish': {'batch_size': 10}}
+        self.git2blog.title_batch_size = 10
+        written = []
+
+        def results():
+            yield self.items[0]
+            yield None, None
+            # Pierwszy post musi być już przekazany dalej przed kolejnym wynikiem
+            self.assertEqual(len(written), 1)
+            yield self.items[1]
+
+        with patch.object(self.git2blog, 'call_ollama', side_effect=['["A"]', '["B"]']):
+            for job, post in self.git2blog.with_titles(results()):
+                written.append(post['title'])
+
+        self.assertEqual(written, ['A', 'B'])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_run_jobs_heartbeat(self):
+        """Test sygnału (None, None), gdy generowanie trwa dłużej niż heartbeat"""
+        job = {'kind': 'commit', 'key': 'k1', 'label': 'Wolny', 'commit': {'hash': 'h1'}}
+
+        def slow_post(job, with_title=True):
+            time.sleep(0.2)
+            return {'title': 'T'}
+
+        with patch.object(self.git2blog, 'load_stored_post', return_value=None), \
+                patch.object(self.git2blog, 'generate_traced_post', side_effect=slow_post):
+            results = list(self.git2blog.run_jobs([job], {}, heartbeat=0.05))
+
+        self.assertIn((None, None), results)
+        self.assertEqual(results[-1], (job, {'title': 'T'}))
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_run_jobs_skips_pending_key(self):
+        """Test pomijania zadania, którego klucz jest już w toku"""
+        jobs = [{'kind': 'commit', 'key': 'k1', 'label': 'Pierwszy', 'commit': {'hash': 'h1'}},
+                {'kind': 'commit', 'key': 'k1', 'label': 'Duplikat', 'commit': {'hash': 'h1'}}]
+
+        with patch.object(self.git2blog, 'load_stored_post', return_value=None), \
+                patch.object(self.git2blog, 'generate_traced_post', return_value={'title': 'T'}):
+            results = list(self.git2blog.run_jobs(jobs, {}))
+
+        self.assertEqual([job['label'] for job, post in results if job], ['Pierwszy'])
+
+class TestPatchIdReuse(unittest.TestCase):
+    """Testy ponownego użycia postów po rebase i cherry-pick"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with patch('os.path.exists', return_value=False):
+            self.git2blog = Git2Blog('nonexistent.yaml')
+        self.git2blog.output_dir = Path(self.temp_dir) / 'blog'
+        self.git2blog.state_dir = self.git2blog.output_dir / '.git2blog'
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def make_job(self, commit_hash, patch_id='p1', subject='Dodaj funkcję',
+                 date='2025-01-15 10:00:00'):
+        commit = {'hash': commit_hash, 'author': 'Jan', 'email': '', 'date': date,
+                  'subject': subject, 'body': '', 'patch_id': patch_id}
+        return {'kind': 'commit', 'commit': commit, 'date': date, 'label': subject,
+                'number': 1, 'file': 'post_1.html'}
+
+    @unittest.skipIf(Git2Blog is None or shutil.which('git') is None, "Brak git lub Git2Blog")
+    def test_cherry_pick_has_same_patch_id(self):
+        """Test jednego potoku patch-id dla commita i jego cherry-picka"""
+        import subprocess
+
+        def git(*args):
+            return subprocess.run(
+                ['git', '-c', 'user.name=T', '-c', 'user.email=t@example.com', *args],
+                cwd=self.temp_dir, capture_output=True, text=True, check=True
+            ).stdout.strip()
+
+        git('init', '-q', '-b', 'main')
+        Path(self.temp_dir, 'a.txt').write_text('a\n')
+        git('add', 'a.txt')
+        git('commit', '-q', '-m', 'Start')
+        git('checkout', '-q', '-b', 'feature')
+        Path(self.temp_dir, 'a.txt').write_text('a\nb\n')
+        git('commit', '-q', '-am', 'Dodaj b')
+        original = git('rev-parse', 'HEAD')
+        git('checkout', '-q', 'main')
+        Path(self.temp_dir, 'c.txt').write_text('c\n')
+        git('add', 'c.txt')
+        git('commit', '-q', '-m', 'Dodaj c')
+        git('cherry-pick', original)
+        picked = git('rev-parse', 'HEAD')
+
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            patch_ids = self.git2blog.get_patch_ids([original, picked])
+        finally:
+            os.chdir(cwd)
+
+        self.assertNotEqual(original, picked)
+        self.assertEqual(patch_ids[original], patch_ids[picked])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_job_key_uses_patch_id_and_message(self):
+        """Test klucza zadania niezależnego od hasha commita"""
+        key = self.git2blog.job_key(self.make_job('aaa'))
+        self.assertEqual(self.git2blog.job_key(self.make_job('bbb')), key)
+        self.assertNotEqual(
+            self.git2blog.job_key(self.make_job('bbb', subject='Inna wiadomość')), key)
+        self.assertNotEqual(self.git2blog.job_key(self.make_job('bbb', patch_id='p2')), key)
+        # Bez patch-id (np. merge) klucz opiera się na hashu
+        self.assertNotEqual(self.git2blog.job_key(self.make_job('aaa', patch_id=None)),
+                            self.git2blog.job_key(self.make_job('bbb', patch_id=None)))
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_rebased_commit_reuses_post(self):
+        """Test ponownego użycia posta po rebase z aktualnym hashem i datą"""
+        old_job = self.make_job('aaa')
+        old_job['key'] = self.git2blog.job_key(old_job)
+        self.git2blog.store_post(old_job['key'], {
+            'title': 'Nowa funkcja', 'content': 'Treść', 'date': '2025-01-15 10:00:00',
+            'author': 'Jan', 'commit_hash': 'aaa'
+        })
+
+        new_job = self.make_job('bbb', date='2025-01-20 09:00:00')
+        new_job['key'] = self.git2blog.job_key(new_job)
+        with patch.object(self.git2blog, 'call_ollama') as mock_call, patch('builtins.print'):
+            self.git2blog.write_posts(self.git2blog.run_jobs([new_job], {}), {})
+
+        mock_call.assert_not_called()
+        stored = self.git2blog.load_stored_post(new_job['key'])
+        self.assertEqual(stored['commit_hash'], 'bbb')
+        self.assertEqual(stored['date'], '2025-01-20 09:00:00')
+        self.assertIn('bbb', (self.git2blog.output_dir / 'post_1.html').read_text(encoding='utf-8'))
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_stale_post_pages_removed(self):
+        """Test usuwania stron postów spoza bieżącej historii po pełnym przebiegu"""
+        job = self.make_job('aaa')
+        job['key'] = self.git2blog.job_key(job)
+        self.git2blog.output_dir.mkdir(parents=True)
+        (self.git2blog.output_dir / 'post_stare.html').write_text('stary', encoding='utf-8')
+        post = {'title': 'T', 'content': 'Treść', 'date': job['date'], 'author': 'Jan',
+                'commit_hash': 'aaa'}
+        with patch('builtins.print'):
+            self.git2blog.write_posts([(job, post)], {})
+
+        self.assertEqual([path.name for path in self.git2blog.output_dir.glob('post_*.html')],
+                         ['post_1.html'])
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_duplicate_change_in_window_gets_own_key(self):
+        """Test osobnych kluczy dla tej samej zmiany występującej dwa razy w historii"""
+        commits = [self.make_job(h, date=f'2025-01-{day} 10:00:00')['commit']
+                   for h, day in (('aaa', 16), ('bbb', 15))]
+        with patch.object(self.git2blog, 'get_patch_ids',
+                          return_value={'aaa': 'p1', 'bbb': 'p1'}), \
+                patch('builtins.print'):
+            jobs = list(self.git2blog.iter_jobs([commits]))
+
+        self.assertEqual(len({job['key'] for job in jobs}), 2)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_repeated_hash_yields_one_job(self):
+        """Test pomijania commita o tym samym hashu występującego dwa razy w strumieniu"""
+        commit = self.make_job('aaa')['commit']
+        with patch.object(self.git2blog, 'get_patch_ids', return_value={'aaa': 'p1'}), \
+                patch('builtins.print'):
+            jobs = list(self.git2blog.iter_jobs([[commit, dict(commit)]]))
+
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0]['number'], 1)
+
+class TestProgressTelemetry(unittest.TestCase):
+    """Testy zdarzeń postępu, eksportu spanów OTLP i metryk Prometheus"""
+
+    def setUp(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import threading
+
+        # Lokalny zamiennik kolektora OpenTelemetry (OTLP/HTTP JSON)
+        self.received = []
+        received = self.received
+
+        class CollectorHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                received.append((self.path, json.loads(body)))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.collector = ThreadingHTTPServer(('127.0.0.1', 0), CollectorHandler)
+        threading.Thread(target=self.collector.serve_forever, daemon=True).start()
+        self.endpoint = f"http://127.0.0.1:{self.collector.server_address[1]}"
+        self.job = {'kind': 'commit', 'label': 'Dodaj cache',
+                    'commit': {'hash': 'abc123', 'subject': 'Dodaj cache', 'body': ''}}
+
+    def tearDown(self):
+        self.collector.shutdown()
+        self.collector.server_close()
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_spans_exported_to_collector(self):
+        """Test spanów przebiegu, posta i wywołania LLM w jednym śladzie"""
+        reporter = ProgressReporter(live=False, otlp_endpoint=self.endpoint)
+        reporter.start()
+        reporter.job_queued(self.job)
+        with reporter.job_span(self.job):
+            reporter.llm_call('body', 'llama3.2', time.time_ns(),
+                              {'prompt_eval_count': 10, 'eval_count': 20})
+        with patch('builtins.print'):
+            reporter.post_written(self.job)
+        reporter.finish()
+
+        self.assertEqual(len(self.received), 1)
+        path, payload = self.received[0]
+        self.assertEqual(path, '/v1/traces')
+        scope_spans = payload['resourceSpans'][0]['scopeSpans'][0]['spans']
+        spans = {span['name']: span for span in scope_spans}
+        self.assertEqual(set(spans), {'generate_blog', 'post', 'llm body'})
+        self.assertEqual(len({span['traceId'] for span in spans.values()}), 1)
+        self.assertEqual(spans['llm body']['parentSpanId'], spans['post']['spanId'])
+        self.assertEqual(spans['post']['parentSpanId'], spans['generate_blog']['spanId'])
+        attributes = {a['key']: a['value'] for a in spans['llm body']['attributes']}
+        self.assertEqual(attributes['gen_ai.usage.output_tokens'], {'intValue': '20'})
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_metrics_endpoint(self):
+        """Test metryk Prometheus udostępnianych w trakcie przebiegu"""
+        import requests
+        reporter = ProgressReporter(snapshot=lambda: {'limit': 3, 'in_flight': 2, 'waiting': 0},
+                                    live=False, metrics_port=0)
+        with patch('builtins.print'):
+            reporter.start()
+            reporter.job_cached(self.job)
+            reporter.llm_call('title', 'llama3.2', time.time_ns(), error='HTTP 503')
+            port = reporter.metrics_server.server_address[1]
+            text = requests.get(f"http://127.0.0.1:{port}/metrics", timeout=5).text
+            reporter.finish()
+
+        self.assertIn('git2blog_llm_calls_total{task="title"} 1', text)
+        self.assertIn('git2blog_llm_errors_total 1', text)
+        self.assertIn('git2blog_llm_in_flight 2', text)
+        self.assertEqual(reporter.metrics_host, '127.0.0.1')
+        self.assertIsNone(reporter.metrics_server)
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_status_line(self):
+        """Test linii widoku na żywo z ETA, tokenami/s, cache i wykryciem przestoju"""
+        reporter = ProgressReporter(snapshot=lambda: {'limit': 4, 'in_flight': 1, 'waiting': 3},
+                                    live=False, stall_seconds=5)
+        reporter.start()
+        for _ in range(4):
+            reporter.job_queued(self.job)
+        reporter.job_cached(self.job)
+        reporter.llm_call('body', 'llama3.2', time.time_ns(), {'eval_count': 100})
+        with patch('builtins.print'):
+            reporter.post_written(self.job)
+        reporter.started -= 10
+        reporter.last_progress -= 10
+
+        line = reporter.status_line()
+        self.assertIn('1/5 postów', line)
+        self.assertIn('ETA 40s', line)
+        self.assertIn('10.0 tok/s', line)
+        self.assertIn('w toku: 1 (limit 4), w kolejce: 3', line)
+        self.assertIn('cache: 1', line)
+        self.assertIn('brak postępu', line)
+        reporter.finish()
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_message_clears_live_line(self):
+        """Test czyszczenia linii stanu przed komunikatem w trybie na żywo"""
+        import io
+        reporter = ProgressReporter(live=True, interval=3600)
+        stderr = io.StringIO()
+        with patch('sys.stderr', stderr), patch('builtins.print') as mock_print:
+            reporter.start()
+            reporter.message('❌ Błąd Ollama API: 500')
+            reporter.finish()
+
+        self.assertTrue(stderr.getvalue().startswith('\r\x1b[K'))
+        mock_print.assert_called_once_with('❌ Błąd Ollama API: 500')
+
+    @unittest.skipIf(Git2Blog is None, "Git2Blog module nie jest dostępny")
+    def test_llm_calls_reported(self):
+        """Test zgłaszania wywołań Ollama do reportera"""
+        with patch('os.path.exists', return_value=False):
+            git2blog = Git2Blog('nonexistent.yaml')
+        response = Mock(status_code=200)
+        response.json.return_value = {'message': {'content': 'Treść'}, 'eval_count': 7}
+        with patch('requests.post', return_value=response):
+            git2blog.call_ollama('prompt', system='system', task='summary')
+
+        self.assertEqual(git2blog.progress.llm_calls, {'summary': 1})
+        self.assertEqual(git2blog.progress.output_tokens, 7)
+
 if __name__ == '__main__':
     # Uruchom testy
     unittest.main(verbosity=2)
\ No newline at end of file